@@ -10,11 +10,13 @@ from PIL import Image
 import numpy as np
 import plotly.figure_factory as ff
 import streamlit as st
-from code.DiseaseModel import DiseaseModel
 from code.helper import prepare_symptoms_array
+from code.registry import default_registry
+from code.manifest import default_dataset_manifest
+from code.schemas import TABULAR_SCHEMAS
+from code.screening import screen
 import seaborn as sns
 import matplotlib.pyplot as plt
-import joblib
 import os
 
 # PWA Configuration - Makes app installable on mobile
@@ -53,25 +55,17 @@ st.markdown("""
     </head>
 """, unsafe_allow_html=True)
 
-# loading the models
-diabetes_model = joblib.load("models/diabetes_model.sav")
-heart_model = joblib.load("models/heart_disease_model.sav")
-parkinson_model = joblib.load("models/parkinsons_model.sav")
-# Load the lung cancer prediction model
-lung_cancer_model = joblib.load('models/lung_cancer_model.sav')
-
-# Load the hepatitis prediction model
-hepatitis_model = joblib.load('models/hepititisc_model.sav')
-
-
-liver_model = joblib.load('models/liver_model.sav')# Load the lung cancer prediction model
-lung_cancer_model = joblib.load('models/lung_cancer_model.sav')
+# Models are loaded on first use and shared by every session of this process
+registry = default_registry()
+# Input choices and ranges of the datasets, built by code/build_manifest.py
+dataset_manifest = default_dataset_manifest()
 
 
 # sidebar
 with st.sidebar:
     selected = option_menu('Multiple Disease Prediction', [
         'Disease Prediction',
+        'Health Screening',
         'Diabetes Prediction',
         'Heart disease Prediction',
         'Parkison Prediction',
@@ -81,43 +75,159 @@ with st.sidebar:
         'Skin Disease Prediction',
 
     ],
-        icons=['','activity', 'heart', 'person','person','person','person','bandaid'],
+        icons=['','clipboard2-pulse','activity', 'heart', 'person','person','person','person','bandaid'],
         default_index=0)
 
+    with st.expander('Loaded models'):
+        for model_name, model_stats in registry.stats().items():
+            memory = '' if model_stats['memory_bytes'] is None else f", {model_stats['memory_bytes']/1e6:.1f} MB"
+            if model_stats['memory_bytes'] is not None and model_stats['memory_approximate']:
+                memory += ' (approximate, loaded alongside other models)'
+            st.write(f"{model_name}: {model_stats['load_seconds']*1000:.0f} ms{memory}")
+
 
 
 
 # multiple disease prediction
 if selected == 'Disease Prediction': 
-    # Create disease class and load ML model
-    disease_model = DiseaseModel()
-    disease_model.load_xgboost('model/xgboost_model.json')
+    # Shared disease model, only used through methods that leave it unchanged
+    disease_model = registry.get('symptom')
 
     # Title
     st.write('# Disease Prediction using Machine Learning')
 
-    symptoms = st.multiselect('What are your symptoms?', options=disease_model.all_symptoms)
-
-    X = prepare_symptoms_array(symptoms)
+    # Free text ("fever, headache and throwing up") adds to the symptom
+    # list. The selection lives in session_state, so editing the text only
+    # replaces the symptoms it matched before and keeps the ones picked by hand
+    def add_described_symptoms():
+        described = st.session_state.described_symptoms
+        matched = disease_model.symptom_matcher().resolve_notes([described])[0] if described else []
+        previous = st.session_state.get('described_matches', [])
+        picked = [symptom for symptom in st.session_state.get('selected_symptoms', []) if symptom not in previous]
+        st.session_state.selected_symptoms = picked + [symptom for symptom in matched if symptom not in picked]
+        st.session_state.described_matches = matched
+
+    st.text_input('Describe your symptoms in your own words (optional)', key='described_symptoms',
+                  on_change=add_described_symptoms)
+
+    symptoms = st.multiselect('What are your symptoms?', options=disease_model.all_symptoms, key='selected_symptoms')
+
+    # Live top 3 while symptoms are picked: each session keeps its own
+    # scorer and only the symptoms that changed are re-scored
+    if 'symptom_scorer' not in st.session_state:
+        st.session_state.symptom_scorer = disease_model.incremental_scorer()
+    scorer = st.session_state.symptom_scorer
+    scorer.set_symptoms([disease_model.vocabulary.index[symptom] for symptom in symptoms])
+    if symptoms:
+        st.caption('Most likely so far: ' + ', '.join(f'{disease} ({prob*100:.1f}%)' for disease, prob in scorer.topk(3)))
+        suggestions = disease_model.suggest_symptoms(symptoms, k=5)
+        if suggestions:
+            st.caption('Worth checking next: ' + ', '.join(symptom for symptom, _ in suggestions))
+
+    X = prepare_symptoms_array(symptoms, disease_model.vocabulary)
 
     # Trigger XGBoost model
     if st.button('Predict'): 
         # Run the model with the python script
         
-        prediction, prob = disease_model.predict(X)
+        predictions, probs, triage = disease_model.predict_triage(X)
+        prediction, prob = predictions[0], probs[0]
         st.write(f'## Disease: {prediction} with {prob*100:.2f}% probability')
+        st.caption(f'Severity-weighted triage score: {triage[0]:.0f}')
 
 
         tab1, tab2= st.tabs(["Description", "Precautions"])
 
         with tab1:
-            st.write(disease_model.describe_predicted_disease())
+            st.write(disease_model.describe_disease(prediction))
 
         with tab2:
-            precautions = disease_model.predicted_disease_precautions()
+            precautions = disease_model.disease_precautions(prediction)
             for i in range(4):
                 st.write(f'{i+1}. {precautions[i]}')
 
+        # Tree path attributions of the prediction, cached per symptom set
+        with st.expander(f'Why {prediction}?'):
+            st.dataframe(disease_model.explain(X, k=10), hide_index=True)
+
+        # Every one-symptom-added / one-symptom-removed variant, scored in one batch
+        with st.expander(f'Which single symptom would change the {prediction} probability most?'):
+            sweep = disease_model.sensitivity_sweep(X)
+            st.dataframe(sweep.head(10), hide_index=True)
+
+
+
+# Screening page: one record, every model it can feed
+if selected == 'Health Screening':
+    st.title("Health screening")
+    st.write('Fill in whatever you have. Every model whose inputs are complete runs at the same time.')
+
+    record = {}
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        record['age'] = st.number_input("Age", value=None)
+    with col2:
+        record['sex'] = st.selectbox("Sex", ["male", "female"])
+
+    with st.expander('Blood panel'):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            record['total_bilirubin'] = st.number_input("Total bilirubin (mg/dL)", value=None)
+            record['alkaline_phosphatase'] = st.number_input("Alkaline phosphatase (U/L)", value=None)
+            record['ast'] = st.number_input("AST (U/L)", value=None)
+            record['ggt'] = st.number_input("GGT (U/L)", value=None)
+        with col2:
+            record['direct_bilirubin'] = st.number_input("Direct bilirubin (mg/dL)", value=None)
+            record['alt'] = st.number_input("ALT (U/L)", value=None)
+            record['total_proteins'] = st.number_input("Total proteins (g/dL)", value=None)
+            record['cholinesterase'] = st.number_input("Cholinesterase (kU/L)", value=None)
+        with col3:
+            record['albumin'] = st.number_input("Albumin (g/dL)", value=None)
+            record['albumin_globulin_ratio'] = st.number_input("Albumin/globulin ratio", value=None)
+            record['cholesterol'] = st.number_input("Cholesterol (mg/dL)", value=None)
+            record['creatinine'] = st.number_input("Creatinine (umol/L)", value=None)
+
+    with st.expander('Diabetes'):
+        col1, col2, col3 = st.columns(3)
+        for idx, feature in enumerate(['Pregnancies', 'Glucose', 'BloodPressure', 'SkinThickness',
+                                       'Insulin', 'BMI', 'DiabetesPedigreeFunction']):
+            with (col1, col2, col3)[idx % 3]:
+                record[feature] = st.number_input(feature, value=None)
+
+    with st.expander('Heart'):
+        heart_schema = TABULAR_SCHEMAS['heart']
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            record['cp'] = st.selectbox("Chest pain type", heart_schema.categories('cp'))
+            record['trestbps'] = st.number_input("Resting blood pressure", value=None)
+            record['fbs'] = st.checkbox('Fasting blood sugar > 120mg/dl')
+        with col2:
+            record['restecg'] = st.selectbox("Resting ECG", heart_schema.categories('restecg'))
+            record['thalach'] = st.number_input("Max heart rate achieved", value=None)
+            record['exang'] = st.checkbox('Exercise induced angina')
+        with col3:
+            record['slope'] = st.selectbox("Peak exercise ST segment", heart_schema.categories('slope'))
+            record['oldpeak'] = st.number_input("ST depression induced by exercise", value=None)
+            record['ca'] = st.number_input("Major vessels colored by flourosopy", value=None)
+            record['thal'] = st.selectbox("Thalassemia", heart_schema.categories('thal'))
+
+    with st.expander('Lung'):
+        col1, col2, col3 = st.columns(3)
+        for idx, feature in enumerate(TABULAR_SCHEMAS['lung_cancer'].names[2:]):
+            with (col1, col2, col3)[idx % 3]:
+                record[feature] = st.selectbox(feature.replace('_', ' ').capitalize(), [None, 'NO', 'YES'],
+                                               format_func=lambda x: '-' if x is None else x)
+
+    record['symptoms'] = st.multiselect('Symptoms', options=registry.get('symptom').all_symptoms)
+
+    if st.button("Run screening"):
+        report = screen(record, registry)
+        if report['results']:
+            st.dataframe(pd.DataFrame(report['results']), hide_index=True)
+        for model_name, missing in report['skipped'].items():
+            st.caption(f"{model_name}: not run, missing {', '.join(missing)}")
+        st.caption(f"Screening took {report['seconds']*1000:.0f} ms")
+
 
 
 
@@ -159,8 +269,11 @@ if selected == 'Diabetes Prediction':  # pagetitle
     # button
     if st.button("Diabetes test result"):
         diabetes_prediction=[[]]
-        diabetes_prediction = diabetes_model.predict(
-            [[Pregnancies, Glucose, BloodPressure, SkinThickness, Insulin, BMI, DiabetesPedigreefunction, Age]])
+        diabetes_prediction = registry.get('diabetes').predict(TABULAR_SCHEMAS['diabetes'].row({
+            'Pregnancies': Pregnancies, 'Glucose': Glucose, 'BloodPressure': BloodPressure,
+            'SkinThickness': SkinThickness, 'Insulin': Insulin, 'BMI': BMI,
+            'DiabetesPedigreeFunction': DiabetesPedigreefunction, 'Age': Age,
+        }))
 
         # after the prediction is done if the value in the list at index is 0 is 1 then the person is diabetic
         if diabetes_prediction[0] == 1:
@@ -191,27 +304,9 @@ if selected == 'Heart disease Prediction':
     with col1:
         age = st.number_input("Age")
     with col2:
-        sex=0
-        display = ("male", "female")
-        options = list(range(len(display)))
-        value = st.selectbox("Gender", options, format_func=lambda x: display[x])
-        if value == "male":
-            sex = 1
-        elif value == "female":
-            sex = 0
+        sex = st.selectbox("Gender", ("male", "female"))
     with col3:
-        cp=0
-        display = ("typical angina","atypical angina","non — anginal pain","asymptotic")
-        options = list(range(len(display)))
-        value = st.selectbox("Chest_Pain Type", options, format_func=lambda x: display[x])
-        if value == "typical angina":
-            cp = 0
-        elif value == "atypical angina":
-            cp = 1
-        elif value == "non — anginal pain":
-            cp = 2
-        elif value == "asymptotic":
-            cp = 3
+        cp = st.selectbox("Chest_Pain Type", TABULAR_SCHEMAS['heart'].categories('cp'))
     with col1:
         trestbps = st.number_input("Resting Blood Pressure")
 
@@ -220,59 +315,23 @@ if selected == 'Heart disease Prediction':
         chol = st.number_input("Serum Cholestrol")
     
     with col3:
-        restecg=0
-        display = ("normal","having ST-T wave abnormality","left ventricular hyperthrophy")
-        options = list(range(len(display)))
-        value = st.selectbox("Resting ECG", options, format_func=lambda x: display[x])
-        if value == "normal":
-            restecg = 0
-        elif value == "having ST-T wave abnormality":
-            restecg = 1
-        elif value == "left ventricular hyperthrophy":
-            restecg = 2
+        restecg = st.selectbox("Resting ECG", TABULAR_SCHEMAS['heart'].categories('restecg'))
 
     with col1:
-        exang=0
         thalach = st.number_input("Max Heart Rate Achieved")
    
     with col2:
         oldpeak = st.number_input("ST depression induced by exercise relative to rest")
     with col3:
-        slope=0
-        display = ("upsloping","flat","downsloping")
-        options = list(range(len(display)))
-        value = st.selectbox("Peak exercise ST segment", options, format_func=lambda x: display[x])
-        if value == "upsloping":
-            slope = 0
-        elif value == "flat":
-            slope = 1
-        elif value == "downsloping":
-            slope = 2
+        slope = st.selectbox("Peak exercise ST segment", TABULAR_SCHEMAS['heart'].categories('slope'))
     with col1:
         ca = st.number_input("Number of major vessels (0–3) colored by flourosopy")
     with col2:
-        thal=0
-        display = ("normal","fixed defect","reversible defect")
-        options = list(range(len(display)))
-        value = st.selectbox("thalassemia", options, format_func=lambda x: display[x])
-        if value == "normal":
-            thal = 0
-        elif value == "fixed defect":
-            thal = 1
-        elif value == "reversible defect":
-            thal = 2
+        thal = st.selectbox("thalassemia", TABULAR_SCHEMAS['heart'].categories('thal'))
     with col3:
-        agree = st.checkbox('Exercise induced angina')
-        if agree:
-            exang = 1
-        else:
-            exang=0
+        exang = st.checkbox('Exercise induced angina')
     with col1:
-        agree1 = st.checkbox('fasting blood sugar > 120mg/dl')
-        if agree1:
-            fbs = 1
-        else:
-            fbs=0
+        fbs = st.checkbox('fasting blood sugar > 120mg/dl')
     # code for prediction
     heart_dig = ''
     
@@ -283,7 +342,11 @@ if selected == 'Heart disease Prediction':
         # change the parameters according to the model
         
         # b=np.array(a, dtype=float)
-        heart_prediction = heart_model.predict([[age, sex, cp, trestbps, chol, fbs, restecg, thalach, exang, oldpeak, slope, ca, thal]])
+        heart_prediction = registry.get('heart').predict(TABULAR_SCHEMAS['heart'].row({
+            'age': age, 'sex': sex, 'cp': cp, 'trestbps': trestbps, 'chol': chol, 'fbs': fbs,
+            'restecg': restecg, 'thalach': thalach, 'exang': exang, 'oldpeak': oldpeak,
+            'slope': slope, 'ca': ca, 'thal': thal,
+        }))
 
         if heart_prediction[0] == 1:
             heart_dig = 'we are really sorry to say but it seems like you have Heart Disease.'
@@ -368,7 +431,10 @@ if selected == 'Parkison Prediction':
     if st.button("Parkinson test result"):
         parkinson_prediction=[[]]
         # change the parameters according to the model
-        parkinson_prediction = parkinson_model.predict([[MDVP, MDVPFIZ, MDVPFLO, MDVPJITTER, MDVPJitterAbs, MDVPRAP, MDVPPPQ, JitterDDP, MDVPShimmer,MDVPShimmer_dB, Shimmer_APQ3, ShimmerAPQ5, MDVP_APQ, ShimmerDDA, NHR, HNR,  RPDE, DFA, spread1, spread2, D2, PPE]])
+        # Values in the model column order declared by the schema
+        parkinson_values = [MDVP, MDVPFIZ, MDVPFLO, MDVPJITTER, MDVPJitterAbs, MDVPRAP, MDVPPPQ, JitterDDP, MDVPShimmer,MDVPShimmer_dB, Shimmer_APQ3, ShimmerAPQ5, MDVP_APQ, ShimmerDDA, NHR, HNR,  RPDE, DFA, spread1, spread2, D2, PPE]
+        parkinson_schema = TABULAR_SCHEMAS['parkinsons']
+        parkinson_prediction = registry.get('parkinsons').predict(parkinson_schema.row(dict(zip(parkinson_schema.names, parkinson_values))))
 
         if parkinson_prediction[0] == 1:
             parkinson_dig = 'we are really sorry to say but it seems like you have Parkinson disease'
@@ -382,12 +448,6 @@ if selected == 'Parkison Prediction':
 
 
 
-# Load the dataset
-lung_cancer_data = pd.read_csv('data/lung_cancer.csv')
-
-# Convert 'M' to 0 and 'F' to 1 in the 'GENDER' column
-lung_cancer_data['GENDER'] = lung_cancer_data['GENDER'].map({'M': 'Male', 'F': 'Female'})
-
 # Lung Cancer prediction page
 if selected == 'Lung Cancer Prediction':
     st.title("Lung Cancer Prediction")
@@ -400,9 +460,13 @@ if selected == 'Lung Cancer Prediction':
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        gender = st.selectbox("Gender:", lung_cancer_data['GENDER'].unique())
+        genders = {'M': 'Male', 'F': 'Female'}
+        gender = st.selectbox("Gender:", sorted(dataset_manifest.categories('data/lung_cancer.csv', 'GENDER'), reverse=True),
+                              format_func=lambda x: genders.get(x, x))
     with col2:
-        age = st.number_input("Age")
+        age_min, age_max = dataset_manifest.bounds('data/lung_cancer.csv', 'AGE')
+        age = st.number_input("Age", min_value=age_min, max_value=age_max,
+                              help=f"The model was trained on patients {age_min:.0f} to {age_max:.0f} years old")
     with col3:
         smoking = st.selectbox("Smoking:", ['NO', 'YES'])
     with col1:
@@ -439,37 +503,27 @@ if selected == 'Lung Cancer Prediction':
 
     # Button
     if st.button("Predict Lung Cancer"):
-        # Create a DataFrame with user inputs
-        user_data = pd.DataFrame({
-            'GENDER': [gender],
-            'AGE': [age],
-            'SMOKING': [smoking],
-            'YELLOW_FINGERS': [yellow_fingers],
-            'ANXIETY': [anxiety],
-            'PEER_PRESSURE': [peer_pressure],
-            'CHRONICDISEASE': [chronic_disease],
-            'FATIGUE': [fatigue],
-            'ALLERGY': [allergy],
-            'WHEEZING': [wheezing],
-            'ALCOHOLCONSUMING': [alcohol_consuming],
-            'COUGHING': [coughing],
-            'SHORTNESSOFBREATH': [shortness_of_breath],
-            'SWALLOWINGDIFFICULTY': [swallowing_difficulty],
-            'CHESTPAIN': [chest_pain]
+        # Model input row built straight from the declared feature schema
+        user_data = TABULAR_SCHEMAS['lung_cancer'].row({
+            'GENDER': gender,
+            'AGE': age,
+            'SMOKING': smoking,
+            'YELLOW_FINGERS': yellow_fingers,
+            'ANXIETY': anxiety,
+            'PEER_PRESSURE': peer_pressure,
+            'CHRONICDISEASE': chronic_disease,
+            'FATIGUE': fatigue,
+            'ALLERGY': allergy,
+            'WHEEZING': wheezing,
+            'ALCOHOLCONSUMING': alcohol_consuming,
+            'COUGHING': coughing,
+            'SHORTNESSOFBREATH': shortness_of_breath,
+            'SWALLOWINGDIFFICULTY': swallowing_difficulty,
+            'CHESTPAIN': chest_pain,
         })
 
-        # Map string values to numeric
-        user_data.replace({'NO': 1, 'YES': 2}, inplace=True)
-
-        # Strip leading and trailing whitespaces from column names
-        user_data.columns = user_data.columns.str.strip()
-
-        # Convert columns to numeric where necessary
-        numeric_columns = ['AGE', 'FATIGUE', 'ALLERGY', 'ALCOHOLCONSUMING', 'COUGHING', 'SHORTNESSOFBREATH']
-        user_data[numeric_columns] = user_data[numeric_columns].apply(pd.to_numeric, errors='coerce')
-
         # Perform prediction
-        cancer_prediction = lung_cancer_model.predict(user_data)
+        cancer_prediction = registry.get('lung_cancer').predict(user_data)
 
         # Display result
         if cancer_prediction[0] == 'YES':
@@ -498,16 +552,9 @@ if selected == 'Liver prediction':  # pagetitle
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        Sex=0
-        display = ("male", "female")
-        options = list(range(len(display)))
-        value = st.selectbox("Gender", options, format_func=lambda x: display[x])
-        if value == "male":
-            Sex = 0
-        elif value == "female":
-            Sex = 1
+        age = st.number_input("Entre your age") # 1
     with col2:
-        age = st.number_input("Entre your age") # 2 
+        Sex = st.selectbox("Gender", ("male", "female")) # 2
     with col3:
         Total_Bilirubin = st.number_input("Entre your Total_Bilirubin") # 3
     with col1:
@@ -531,7 +578,12 @@ if selected == 'Liver prediction':  # pagetitle
     # button
     if st.button("Liver test result"):
         liver_prediction=[[]]
-        liver_prediction = liver_model.predict([[Sex,age,Total_Bilirubin,Direct_Bilirubin,Alkaline_Phosphotase,Alamine_Aminotransferase,Aspartate_Aminotransferase,Total_Protiens,Albumin,Albumin_and_Globulin_Ratio]])
+        liver_prediction = registry.get('liver').predict(TABULAR_SCHEMAS['liver'].row({
+            'Age': age, 'Gender': Sex, 'Total_Bilirubin': Total_Bilirubin, 'Direct_Bilirubin': Direct_Bilirubin,
+            'Alkaline_Phosphotase': Alkaline_Phosphotase, 'Alamine_Aminotransferase': Alamine_Aminotransferase,
+            'Aspartate_Aminotransferase': Aspartate_Aminotransferase, 'Total_Protiens': Total_Protiens,
+            'Albumin': Albumin, 'Albumin_and_Globulin_Ratio': Albumin_and_Globulin_Ratio,
+        }))
 
         # after the prediction is done if the value in the list at index is 0 is 1 then the person is diabetic
         if liver_prediction[0] == 1:
@@ -561,10 +613,11 @@ if selected == 'Hepatitis prediction':
     col1, col2, col3 = st.columns(3)
 
     with col1:
-        age = st.number_input("Enter your age")  # 2
+        age_min, age_max = dataset_manifest.bounds('Datasets/HepatitisCdata.csv', 'Age')
+        age = st.number_input("Enter your age", min_value=age_min, max_value=age_max,
+                              help=f"The model was trained on patients {age_min:.0f} to {age_max:.0f} years old")  # 2
     with col2:
-        sex = st.selectbox("Gender", ["Male", "Female"])
-        sex = 1 if sex == "Male" else 2
+        sex = st.selectbox("Gender", TABULAR_SCHEMAS['hepatitis'].categories('Sex')[:2])
     with col3:
         total_bilirubin = st.number_input("Enter your Total Bilirubin")  # 3
 
@@ -595,24 +648,24 @@ if selected == 'Hepatitis prediction':
 
     # Button
     if st.button("Predict Hepatitis"):
-        # Create a DataFrame with user inputs
-        user_data = pd.DataFrame({
-            'Age': [age],
-            'Sex': [sex],
-            'ALB': [total_bilirubin],  # Correct the feature name
-            'ALP': [direct_bilirubin],  # Correct the feature name
-            'ALT': [alkaline_phosphatase],  # Correct the feature name
-            'AST': [alamine_aminotransferase],
-            'BIL': [aspartate_aminotransferase],  # Correct the feature name
-            'CHE': [total_proteins],  # Correct the feature name
-            'CHOL': [albumin],  # Correct the feature name
-            'CREA': [albumin_and_globulin_ratio],  # Correct the feature name
-            'GGT': [your_ggt_value],  # Replace 'your_ggt_value' with the actual value
-            'PROT': [your_prot_value]  # Replace 'your_prot_value' with the actual value
+        # Model input row built straight from the declared feature schema
+        user_data = TABULAR_SCHEMAS['hepatitis'].row({
+            'Age': age,
+            'Sex': sex,
+            'ALB': total_bilirubin,  # Correct the feature name
+            'ALP': direct_bilirubin,  # Correct the feature name
+            'ALT': alkaline_phosphatase,  # Correct the feature name
+            'AST': alamine_aminotransferase,
+            'BIL': aspartate_aminotransferase,  # Correct the feature name
+            'CHE': total_proteins,  # Correct the feature name
+            'CHOL': albumin,  # Correct the feature name
+            'CREA': albumin_and_globulin_ratio,  # Correct the feature name
+            'GGT': your_ggt_value,  # Replace 'your_ggt_value' with the actual value
+            'PROT': your_prot_value  # Replace 'your_prot_value' with the actual value
         })
 
         # Perform prediction
-        hepatitis_prediction = hepatitis_model.predict(user_data)
+        hepatitis_prediction = registry.get('hepatitis').predict(user_data)
         # Display result
         if hepatitis_prediction[0] == 1:
             hepatitis_result = "We are really sorry to say but it seems like you have Hepatitis."
@@ -676,7 +729,7 @@ if selected == 'Jaundice prediction':  # pagetitle
     # button
     if st.button("Jaundice test result"):
         jaundice_prediction=[[]]
-        jaundice_prediction = liver_model.predict([[age,Sex,Total_Bilirubin,Direct_Bilirubin,Alkaline_Phosphotase,Alamine_Aminotransferase,Total_Protiens,Albumin]])
+        jaundice_prediction = registry.get('liver').predict([[age,Sex,Total_Bilirubin,Direct_Bilirubin,Alkaline_Phosphotase,Alamine_Aminotransferase,Total_Protiens,Albumin]])
 
         # after the prediction is done if the value in the list at index is 0 is 1 then the person is diabetic
         if jaundice_prediction[0] == 1:
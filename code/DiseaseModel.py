@@ -1,41 +1,393 @@
 
+import json
+import warnings
+
 import xgboost as xgb
 import pandas as pd
+import numpy as np
+
+from code.artifacts import file_sha1, load_preferred_model
+from code.bundle import cooccurrence_from_bytes, lookup_table_from_bytes, read_bundle
+from code.cache import symptom_key
+from code.cascade import SymptomCascade
+from code.columnar import column_names, read_frame, read_matrix
+from code.compiled import CompiledEnsemble
+from code.cooccurrence import CooccurrenceIndex
+from code.fuzzy import SymptomMatcher, read_synonyms
+from code.incremental import IncrementalScorer
+from code.knowledge import DiseaseKnowledgeBase, default_knowledge_base
+from code.lookup import PatternLookupTable, topk_arrays
+from code.triage import SeverityWeights, read_severity
+from code.vocabulary import SymptomVocabulary
 
 class DiseaseModel:
 
-    def __init__(self):
+    def __init__(self, cache=None, diseases=None, knowledge_base=None):
         self.all_symptoms = None
         self.symptoms = None
         self.pred_disease = None
+        self.vocabulary = None
+        self.engine = None
+        self.cache = cache
+        self.lookup_table = None
+        self.cooccurrence = None
+        self.synonyms = None
+        self.matcher = None
+        self.cascade = None
+        self.severity = None
+        self.severity_weights = None
+        self.model_version = None
+        self.knowledge_base = knowledge_base if knowledge_base is not None else default_knowledge_base()
         self.model = xgb.XGBClassifier()
-        self.diseases = self.disease_list('data/dataset.csv')
+        self.diseases = diseases if diseases is not None else self.disease_list('data/dataset.csv')
+
+    @classmethod
+    def from_bundle(cls, bundle_path='model/symptom_bundle.zip', cache=None):
+        '''
+        Build a ready to use model from the single bundle written by
+        train.py, without reading anything from the data folder
+        '''
+        manifest, members = read_bundle(bundle_path)
+        metadata = json.loads(members['metadata.json'])
+
+        disease_model = cls(
+            cache=cache,
+            diseases=pd.Index(metadata['diseases']),
+            knowledge_base=DiseaseKnowledgeBase(metadata['descriptions'], metadata['precautions']),
+        )
+        disease_model.model.load_model(bytearray(members['model.ubj']))
+        disease_model.model_version = manifest['model_version']
+        disease_model.vocabulary = SymptomVocabulary(metadata['symptoms'])
+        disease_model.all_symptoms = pd.Index(metadata['symptoms'])
+        if 'lookup.npz' in members:
+            disease_model.lookup_table = lookup_table_from_bytes(members['lookup.npz'])
+        if 'cooccurrence.npz' in members:
+            disease_model.cooccurrence = cooccurrence_from_bytes(members['cooccurrence.npz'])
+        disease_model.synonyms = metadata.get('synonyms')
+        disease_model.severity = metadata.get('severity')
+
+        return disease_model
 
     def load_xgboost(self, model_path):
-        self.model.load_model(model_path)
+        # Loads the faster .ubj twin of a .json model when train.py wrote one
+        model_path = load_preferred_model(self.model, model_path)
+        self.model_version = self.model.get_booster().attr('model_version') or file_sha1(model_path)
+        self.vocabulary = SymptomVocabulary.from_model(self.model)
 
     def save_xgboost(self, model_path):
         self.model.save_model(model_path)
 
+    def compile_model(self, compiled_path=None):
+        '''
+        Compile the loaded ensemble to NumPy arrays and use it for every
+        prediction instead of the xgboost runtime. compiled_path loads the
+        arrays train.py saved for the same model instead of compiling; they
+        are compiled again (with a warning) when saved for another model version.
+        '''
+        if compiled_path is not None:
+            engine = CompiledEnsemble.load(compiled_path)
+            if engine.model_version == self.model_version:
+                self.engine = engine
+                return
+            warnings.warn(f"{compiled_path} was saved for model {engine.model_version}, not the loaded "
+                          f"{self.model_version}; compiling the loaded model instead")
+        self.engine = CompiledEnsemble.from_booster(self.model.get_booster())
+        self.engine.model_version = self.model_version
+
+    def incremental_scorer(self):
+        '''
+        New IncrementalScorer for live re-scoring while symptoms are picked
+        one at a time. Compiles the model on first use.
+        '''
+        if self.engine is None:
+            self.compile_model()
+        return IncrementalScorer(self.engine, labels=self.diseases.values)
+
+    def predict_proba(self, X):
+        '''
+        Disease probabilities for every row of X. With a cache attached,
+        0/1 symptom rows seen before are answered from the cache and only
+        the new rows reach the model.
+        '''
+        if self.cache is None:
+            return self.model_predict_proba(X)
+
+        X = np.asarray(X.toarray() if hasattr(X, 'toarray') else X)
+        if not ((X == 0) | (X == 1)).all():
+            return self.model_predict_proba(X)
+
+        keys = [(self.model_version, symptom_key(row)) for row in X]
+        probabilities = [self.cache.get(key) for key in keys]
+        missing = [i for i, row in enumerate(probabilities) if row is None]
+        if missing:
+            computed = self.model_predict_proba(X[missing])
+            for i, row in zip(missing, computed):
+                row.setflags(write=False)
+                self.cache.put(keys[i], row)
+                probabilities[i] = row
+
+        return np.vstack(probabilities)
+
+    def model_predict_proba(self, X):
+        if self.engine is not None:
+            return self.engine.predict_proba(X)
+        return self.model.predict_proba(X)
+
     def predict(self, X):
         self.symptoms = X
-        disease_pred_idx = self.model.predict(self.symptoms)
-        self.pred_disease = self.diseases[disease_pred_idx].values[0]
-        disease_probability_array = self.model.predict_proba(self.symptoms)
-        disease_probability = disease_probability_array[0, disease_pred_idx[0]]
-        return self.pred_disease, disease_probability
+        diseases, probabilities = self.predict_batch(self.symptoms)
+        self.pred_disease = diseases[0]
+        return self.pred_disease, probabilities[0]
+
+    def predict_batch(self, X):
+        '''
+        Predict the most likely disease for every row of X with a single
+        pass over the trees. Does not modify the model state.
+
+        Output:
+        - diseases (np.array) = predicted disease name per row
+        - probabilities (np.array) = probability of the predicted disease per row
+        '''
+        top_idx, top_prob = self.topk_indices(X, 1)
+        return self.diseases[top_idx[:, 0]].values, top_prob[:, 0]
+
+    def predict_topk(self, X, k=3):
+        '''
+        Return the k most likely diseases for every row of X, best first,
+        with a single pass over the trees. Does not modify the model state.
+
+        Output:
+        - list with one [(disease, probability), ...] list per row
+        '''
+        return self.topk_names(*self.topk_indices(X, k))
+
+    def topk_from_proba(self, disease_probability_array, k=3):
+        return self.topk_names(*topk_arrays(disease_probability_array, k))
+
+    def topk_names(self, top_idx, top_prob):
+        names = self.diseases.values[top_idx]
+        return [list(zip(row_names, row_prob)) for row_names, row_prob in zip(names.tolist(), top_prob.tolist())]
+
+    def topk_indices(self, X, k=3):
+        '''
+        Class indices and probabilities of the k most likely diseases per
+        row. Patterns found in the lookup table skip the model entirely.
+        '''
+        if self.lookup_table is None or k > self.lookup_table.k:
+            return topk_arrays(self.predict_proba(X), k)
+
+        X = np.asarray(X.toarray() if hasattr(X, 'toarray') else X)
+        found, top_idx, top_prob = self.lookup_table.lookup(X, k)
+        missing = np.flatnonzero(~found)
+        if len(missing):
+            top_idx[missing], top_prob[missing] = topk_arrays(self.predict_proba(X[missing]), k)
+
+        return top_idx, top_prob
+
+    def triage_scores(self, X):
+        '''
+        Severity-weighted triage score of every row of X (sum of the
+        Symptom-severity weights of the symptoms present), higher is more urgent
+        '''
+        return self.severity_scorer().score(X)
+
+    def severity_scorer(self):
+        '''
+        SeverityWeights over this model's vocabulary, built on first use
+        '''
+        if self.severity_weights is None:
+            severity = self.severity if self.severity is not None else read_severity()
+            self.severity_weights = SeverityWeights(self.vocabulary, severity)
+        return self.severity_weights
+
+    def predict_triage(self, X):
+        '''
+        predict_batch with the triage score of every row next to it
+
+        Output:
+        - diseases (np.array) = predicted disease name per row
+        - probabilities (np.array) = probability of the predicted disease per row
+        - triage (np.array) = triage score per row; np.argsort(-triage) is the queue order
+        '''
+        diseases, probabilities = self.predict_batch(X)
+        return diseases, probabilities, self.triage_scores(X)
+
+    def enable_cascade(self, X=None, target_agreement=0.995):
+        '''
+        Train the two-stage cascade used by predict_cascade on the symptom
+        rows of X (the clean dataset by default). Compiles the model first,
+        the full model labels a few tens of thousands of rows.
+
+        Output:
+        - min_margin (float) = first stage score margin needed to skip the full model
+        '''
+        if X is None:
+            X = read_matrix('data/clean_dataset.tsv', self.vocabulary.symptoms)
+        if self.engine is None:
+            self.compile_model()
+        self.cascade = SymptomCascade.train(X, self.model_predict_proba, len(self.diseases), target_agreement)
+        return self.cascade.min_margin
+
+    def predict_cascade(self, X):
+        '''
+        Like predict_batch, but rows the cheap first stage is confident
+        about never reach the tree ensemble. Call enable_cascade first.
+
+        Output:
+        - diseases (np.array) = predicted disease name per row
+        - probabilities (np.array) = probability of the predicted disease for
+          the escalated rows, NaN for the rows the first stage answered (use
+          predict_batch where every row needs a probability)
+        - escalated (np.array) = True for the rows scored by the full model
+        '''
+        classes, probabilities, escalated = self.cascade.predict(X)
+        return self.diseases.values[classes], probabilities, escalated
+
+    def cascade_report(self, X):
+        '''
+        Escalation rate of the cascade on X, its agreement with the full
+        model and the time of both
+        '''
+        return self.cascade.report(X)
+
+    def sensitivity_sweep(self, X):
+        '''
+        What-if analysis for one symptom vector: every variant with a single
+        symptom added or removed is scored in one batched call, and ranked
+        by how much it moves the probability of the current top disease.
+
+        Output:
+        - pd.DataFrame with one row per variant: symptom, change ('added' or
+          'removed'), shift of the current top disease probability, and the
+          top disease of the variant with its probability
+        '''
+        base = np.asarray(X.toarray() if hasattr(X, 'toarray') else X, dtype=np.float64).reshape(1, -1)
+        width = base.shape[1]
+
+        # Row 0 is the vector itself, row i + 1 flips symptom i
+        variants = np.repeat(base, width + 1, axis=0)
+        flip = np.arange(width)
+        variants[flip + 1, flip] = 1 - variants[flip + 1, flip]
+
+        # Straight to the model: the variants would only crowd the cache
+        proba = self.model_predict_proba(variants)
+        top_class = proba[0].argmax()
+        variant_top = proba[1:].argmax(axis=1)
+
+        sweep = pd.DataFrame({
+            'symptom': self.vocabulary.symptoms,
+            'change': np.where(base[0] == 1, 'removed', 'added'),
+            'shift': proba[1:, top_class] - proba[0, top_class],
+            'top_disease': self.diseases.values[variant_top],
+            'top_probability': proba[flip + 1, variant_top],
+        })
+        return sweep.reindex(sweep['shift'].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+    def explain_batch(self, X):
+        '''
+        Per-symptom contributions to the predicted disease of every row,
+        from the exact tree path attributions of XGBoost (pred_contribs).
+        Contributions are in margin (log-odds) units and add up, with the
+        bias, to the margin of the predicted disease.
+
+        Identical rows are attributed once, and with a cache attached 0/1
+        rows explained before are not attributed again.
+
+        Output:
+        - diseases (np.array) = predicted disease name per row
+        - contributions (np.array) = (n_rows, n_symptoms) contribution of every symptom
+        - bias (np.array) = contribution not tied to any symptom, per row
+        '''
+        X = np.asarray(X.toarray() if hasattr(X, 'toarray') else X, dtype=np.float32).reshape(-1, self.vocabulary.width)
+        cacheable = self.cache is not None and bool(((X == 0) | (X == 1)).all())
+
+        # Row layout: [predicted class, contribution per symptom..., bias]
+        explained = [None] * len(X)
+        if cacheable:
+            keys = [(self.model_version, 'contribs', symptom_key(row)) for row in X]
+            explained = [self.cache.get(key) for key in keys]
+        missing = np.array([i for i, row in enumerate(explained) if row is None], dtype=np.int64)
+
+        if len(missing):
+            unique_rows, inverse = np.unique(X[missing], axis=0, return_inverse=True)
+            booster = self.model.get_booster()
+            contribs = booster.predict(xgb.DMatrix(unique_rows, feature_names=booster.feature_names),
+                                       pred_contribs=True).reshape(len(unique_rows), len(self.diseases), -1)
+            # The margin of a class is the sum of its contributions
+            predicted = contribs.sum(axis=2).argmax(axis=1)
+            rows = np.column_stack([predicted, contribs[np.arange(len(unique_rows)), predicted]])
+            for i, unique_idx in zip(missing, inverse.ravel()):
+                row = rows[unique_idx].copy()
+                row.setflags(write=False)
+                if cacheable:
+                    self.cache.put(keys[i], row)
+                explained[i] = row
+
+        explained = np.vstack(explained)
+        predicted = explained[:, 0].astype(np.int64)
+        return self.diseases.values[predicted], explained[:, 1:-1], explained[:, -1]
+
+    def explain(self, X, k=10):
+        '''
+        Why the first row of X got its predicted disease
+
+        Output:
+        - pd.DataFrame with the k symptoms that moved the prediction most:
+          symptom, whether it is present, and its contribution (positive
+          values speak for the predicted disease)
+        '''
+        X = np.asarray(X.toarray() if hasattr(X, 'toarray') else X).reshape(-1, self.vocabulary.width)[:1]
+        _, contributions, _ = self.explain_batch(X)
+        explanation = pd.DataFrame({
+            'symptom': self.vocabulary.symptoms,
+            'present': X[0] != 0,
+            'contribution': contributions[0],
+        })
+        order = explanation['contribution'].abs().sort_values(ascending=False).index
+        return explanation.reindex(order).head(k).reset_index(drop=True)
+
+    def load_lookup_table(self, table_path):
+        table = PatternLookupTable.load(table_path)
+        if table.model_version != self.model_version:
+            raise ValueError(f"Lookup table {table_path} was built for a different model, rebuild it")
+        self.lookup_table = table
+
+    def load_cooccurrence(self, index_path):
+        self.cooccurrence = CooccurrenceIndex.load(index_path)
+
+    def suggest_symptoms(self, symptoms, k=5):
+        '''
+        Symptoms most worth asking about next, given the selected ones
+
+        Output:
+        - list of (symptom, information gain in bits), best first
+        '''
+        if self.cooccurrence is None:
+            return []
+
+        selected = [self.vocabulary.index[symptom] for symptom in symptoms]
+        return [(self.vocabulary.symptoms[idx], gain) for idx, gain in self.cooccurrence.suggest(selected, k)]
+
+    def symptom_matcher(self):
+        '''
+        SymptomMatcher for free-text symptom entry over this model's
+        vocabulary, built on first use
+        '''
+        if self.matcher is None:
+            synonyms = self.synonyms if self.synonyms is not None else read_synonyms()
+            self.matcher = SymptomMatcher(self.vocabulary, synonyms)
+        return self.matcher
 
-    
     def describe_disease(self, disease_name):
 
         if disease_name not in self.diseases:
             return "That disease is not contemplated in this model"
-        
-        # Read disease dataframe
-        desc_df = pd.read_csv('data/symptom_Description.csv')
-        desc_df = desc_df.apply(lambda col: col.str.strip())
 
-        return desc_df[desc_df['Disease'] == disease_name]['Description'].values[0]
+        description = self.knowledge_base.describe(disease_name)
+        if description is None:
+            return "No description available for that disease"
+
+        return description
 
     def describe_predicted_disease(self):
 
@@ -49,11 +401,11 @@ class DiseaseModel:
         if disease_name not in self.diseases:
             return "That disease is not contemplated in this model"
 
-        # Read precautions dataframe
-        prec_df = pd.read_csv('data/symptom_precaution.csv')
-        prec_df = prec_df.apply(lambda col: col.str.strip())
+        precautions = self.knowledge_base.disease_precautions(disease_name)
+        if precautions is None:
+            return "No precautions available for that disease"
 
-        return prec_df[prec_df['Disease'] == disease_name].filter(regex='Precaution').values.tolist()[0]
+        return precautions
 
     def predicted_disease_precautions(self):
 
@@ -64,12 +416,11 @@ class DiseaseModel:
 
     def disease_list(self, kaggle_dataset):
 
-        df = pd.read_csv('data/clean_dataset.tsv', sep='\t')
-        # Preprocessing
-        y_data = df.iloc[:,-1]
-        X_data = df.iloc[:,:-1]
+        # Only the header and the disease column are needed
+        columns = column_names('data/clean_dataset.tsv')
+        y_data = read_frame('data/clean_dataset.tsv', columns[-1:]).iloc[:, 0]
 
-        self.all_symptoms = X_data.columns
+        self.all_symptoms = pd.Index(columns[:-1])
 
         # Convert y to categorical values
         y_data = y_data.astype('category')
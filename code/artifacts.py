@@ -0,0 +1,63 @@
+import hashlib
+import os
+import warnings
+
+
+def file_sha1(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def preferred_model_path(model_path):
+    '''
+    Return the UBJSON twin of a .json model when it exists, since it loads
+    much faster than parsing the JSON document
+    '''
+    root, ext = os.path.splitext(model_path)
+    if ext == '.json' and os.path.exists(root + '.ubj'):
+        return root + '.ubj'
+    return model_path
+
+
+def load_preferred_model(model, model_path):
+    '''
+    Load model_path into model (an xgb.Booster or XGBClassifier), from its
+    UBJSON twin when there is one exported from this same JSON file (the
+    twin's model_version is the hash of the JSON). A stale twin, e.g. next
+    to a retrained or pulled JSON model, is skipped with a warning.
+
+    Output:
+    - path (str) = file the model was loaded from
+    '''
+    path = preferred_model_path(model_path)
+    model.load_model(path)
+    if path == model_path:
+        return path
+
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    if booster.attr('model_version') == file_sha1(model_path):
+        return path
+
+    warnings.warn(f"{path} was not exported from the current {model_path}, loading the JSON model instead"
+                  " (rerun export_binary_model)")
+    model.load_model(model_path)
+    return model_path
+
+
+def export_binary_model(json_path):
+    '''
+    Write the UBJSON version of a JSON model next to it.
+
+    The booster is tagged with the hash of the JSON file as model_version,
+    so caches and lookup tables built for one format stay valid for the other.
+    '''
+    import xgboost as xgb
+
+    booster = xgb.Booster()
+    booster.load_model(json_path)
+    if booster.attr('model_version') is None:
+        booster.set_attr(model_version=file_sha1(json_path))
+
+    ubj_path = os.path.splitext(json_path)[0] + '.ubj'
+    booster.save_model(ubj_path)
+    return ubj_path
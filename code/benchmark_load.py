@@ -0,0 +1,63 @@
+# Run from the repository root: python -m code.benchmark_load
+#
+# Compares how long the symptom model takes to load from each artifact
+# format. Cold is a fresh Python process (library import plus first load),
+# warm is the best of several loads in an already running process.
+
+import os
+import subprocess
+import sys
+import time
+
+FORMATS = {
+    'json': ('model/xgboost_model.json',
+             'import xgboost as xgb\n'
+             'model = xgb.XGBClassifier()\n'
+             'model.load_model({path!r})\n'),
+    'ubj': ('model/xgboost_model.ubj',
+            'import xgboost as xgb\n'
+            'model = xgb.XGBClassifier()\n'
+            'model.load_model({path!r})\n'),
+    'compiled npz': ('model/compiled_model.npz',
+                     'from code.compiled import CompiledEnsemble\n'
+                     'model = CompiledEnsemble.load({path!r})\n'),
+}
+
+TIMED = 'import time\nstart = time.perf_counter()\n{load}print(time.perf_counter() - start)\n'
+
+
+def cold_load_time(load_code, repeats=3):
+    times = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', TIMED.format(load=load_code)],
+                                capture_output=True, text=True, check=True).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return min(times)
+
+
+def warm_load_time(load_code, repeats=10):
+    # Import once so only the load itself is timed
+    exec(load_code, {})
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        exec(load_code, {})
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    print(f"{'format':<14}{'size (KB)':>12}{'cold (ms)':>12}{'warm (ms)':>12}")
+    for name, (path, template) in FORMATS.items():
+        if not os.path.exists(path):
+            print(f"{name:<14}{'missing, run python -m code.train':>36}")
+            continue
+        load_code = template.format(path=path)
+        size = os.path.getsize(path) / 1024
+        cold = cold_load_time(load_code) * 1000
+        warm = warm_load_time(load_code) * 1000
+        print(f"{name:<14}{size:>12.0f}{cold:>12.1f}{warm:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,22 @@
+# Run from the repository root: python -m code.build_columnar
+#
+# Converts the CSV/TSV datasets of data/ and Datasets/ to typed, uncompressed
+# Arrow files under data/columnar/, which code.columnar opens memory-mapped
+# instead of parsing text. Rerun it whenever a dataset changes (train.py
+# refreshes the copy of clean_dataset.tsv it writes).
+
+import os
+
+from code.columnar import DATASET_PATTERNS, STORE_DIR, convert_dataset, dataset_paths
+
+
+def build_columnar_store(patterns=DATASET_PATTERNS, store_dir=STORE_DIR):
+    paths = dataset_paths(patterns)
+    for path in paths:
+        stored = convert_dataset(path, store_dir)
+        print(f"{path} ({os.path.getsize(path) / 1e3:.0f} kB) -> {stored} ({os.path.getsize(stored) / 1e3:.0f} kB)")
+    return paths
+
+
+if __name__ == '__main__':
+    build_columnar_store()
@@ -0,0 +1,26 @@
+# Run from the repository root: python -m code.build_lookup
+#
+# Precomputes the symptom model output for every distinct symptom pattern
+# of the training set, so DiseaseModel answers known patterns with a single
+# lookup. Rerun it after every retraining of model/xgboost_model.json.
+
+from code.columnar import read_matrix
+from code.DiseaseModel import DiseaseModel
+from code.lookup import PatternLookupTable
+
+
+def build_lookup_table(model_path='model/xgboost_model.json', dataset_path='data/clean_dataset.tsv',
+                       table_path='model/symptom_lookup.npz', k=5):
+    disease_model = DiseaseModel()
+    disease_model.load_xgboost(model_path)
+
+    X_data = read_matrix(dataset_path, disease_model.vocabulary.symptoms)
+
+    table = PatternLookupTable.build(disease_model, X_data, k=k)
+    table.save(table_path)
+    print(f"Stored top-{k} predictions of {len(table)} distinct patterns ({len(X_data)} rows) in {table_path}")
+    return table
+
+
+if __name__ == '__main__':
+    build_lookup_table()
@@ -0,0 +1,69 @@
+# Run from the repository root: python -m code.build_manifest
+#
+# Scans the datasets of data/ and Datasets/ once and writes a compact
+# JSON manifest (row counts, category vocabularies, numeric ranges and
+# quantiles per column), so the app never parses a CSV to fill its inputs.
+# Rerun it whenever a dataset changes.
+
+import json
+
+import pandas as pd
+
+from code.columnar import DATASET_PATTERNS, dataset_paths, read_frame
+
+QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+# Columns with more distinct values than this are not listed value by value
+MAX_CATEGORIES = 64
+MAX_NUMERIC_VALUES = 20
+
+
+def json_number(value):
+    return None if pd.isna(value) else float(value)
+
+
+def describe_column(column):
+    values = column.dropna()
+    n_unique = int(values.nunique())
+    info = {
+        'count': int(len(values)),
+        'missing': int(column.isna().sum()),
+        'n_unique': n_unique,
+    }
+
+    if pd.api.types.is_numeric_dtype(column):
+        info['type'] = 'numeric'
+        info['min'] = json_number(values.min())
+        info['max'] = json_number(values.max())
+        info['quantiles'] = {str(q): json_number(values.quantile(q)) for q in QUANTILES}
+        if n_unique <= MAX_NUMERIC_VALUES:
+            info['values'] = sorted(values.unique().tolist())
+    else:
+        info['type'] = 'category'
+        values = values.astype(str).str.strip()
+        if n_unique <= MAX_CATEGORIES:
+            info['categories'] = sorted(values.unique().tolist())
+
+    return info
+
+
+def describe_dataset(path):
+    # Column names come stripped (and without byte order mark) from the loader
+    df = read_frame(path)
+    return {
+        'rows': int(len(df)),
+        'columns': {name: describe_column(df[name]) for name in df.columns},
+    }
+
+
+def build_manifest(patterns=DATASET_PATTERNS, manifest_path='data/dataset_manifest.json'):
+    paths = dataset_paths(patterns)
+    manifest = {'datasets': {path.replace('\\', '/'): describe_dataset(path) for path in paths}}
+
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    print(f"Described {len(paths)} datasets in {manifest_path}")
+    return manifest
+
+
+if __name__ == '__main__':
+    build_manifest()
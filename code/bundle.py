@@ -0,0 +1,119 @@
+import hashlib
+import io
+import json
+import zipfile
+
+import pandas as pd
+
+from code.artifacts import file_sha1, load_preferred_model
+from code.cooccurrence import CooccurrenceIndex
+from code.fuzzy import read_synonyms
+from code.knowledge import DiseaseKnowledgeBase
+from code.lookup import PatternLookupTable
+from code.triage import read_severity
+
+BUNDLE_FORMAT = 1
+
+
+def payload_checksum(members):
+    digest = hashlib.sha256()
+    for name in sorted(members):
+        digest.update(name.encode())
+        digest.update(members[name])
+    return digest.hexdigest()
+
+
+def write_bundle(bundle_path='model/symptom_bundle.zip', model_path='model/xgboost_model.json',
+                 dataset_path='data/clean_dataset.tsv', knowledge_base=None,
+                 table_path='model/symptom_lookup.npz', cooccurrence_path='model/symptom_cooccurrence.npz',
+                 synonyms_path='data/symptom_synonyms.csv', severity_path='data/Symptom-severity.csv'):
+    '''
+    Write everything the symptom predictor needs at runtime into one file:
+    the model, the symptom vocabulary with its synonyms and severity
+    weights, the disease labels, the description and precaution tables and
+    (if present) the pattern lookup table and the co-occurrence index, with a sha256 checksum over all of it.
+    '''
+    import xgboost as xgb
+
+    if knowledge_base is None:
+        knowledge_base = DiseaseKnowledgeBase.from_csv()
+
+    booster = xgb.Booster()
+    load_preferred_model(booster, model_path)
+    model_version = booster.attr('model_version') or file_sha1(model_path)
+    if booster.attr('model_version') is None:
+        booster.set_attr(model_version=model_version)
+
+    df = pd.read_csv(dataset_path, sep='\t')
+    symptoms = list(df.columns[:-1])
+    if booster.feature_names is not None and list(booster.feature_names) != symptoms:
+        raise ValueError(f"Symptom columns of {dataset_path} do not match the model features")
+
+    metadata = {
+        'symptoms': symptoms,
+        'diseases': list(df.iloc[:, -1].astype('category').cat.categories),
+        'descriptions': knowledge_base.descriptions,
+        'precautions': knowledge_base.precautions,
+        'synonyms': read_synonyms(synonyms_path),
+        'severity': read_severity(severity_path),
+    }
+    members = {
+        'model.ubj': bytes(booster.save_raw('ubj')),
+        'metadata.json': json.dumps(metadata).encode(),
+    }
+    try:
+        with open(table_path, 'rb') as f:
+            members['lookup.npz'] = f.read()
+    except FileNotFoundError:
+        pass
+    else:
+        if lookup_table_from_bytes(members['lookup.npz']).model_version != model_version:
+            raise ValueError(f"Lookup table {table_path} was built for a different model, rebuild it")
+
+    try:
+        with open(cooccurrence_path, 'rb') as f:
+            members['cooccurrence.npz'] = f.read()
+    except FileNotFoundError:
+        pass
+
+    manifest = {
+        'format': BUNDLE_FORMAT,
+        'model_version': model_version,
+        'members': sorted(members),
+        'sha256': payload_checksum(members),
+    }
+    # Stored without compression so reading is a plain copy
+    with zipfile.ZipFile(bundle_path, 'w', compression=zipfile.ZIP_STORED) as bundle:
+        bundle.writestr('manifest.json', json.dumps(manifest))
+        for name, data in members.items():
+            bundle.writestr(name, data)
+
+    return manifest
+
+
+def read_bundle(bundle_path='model/symptom_bundle.zip'):
+    '''
+    Read and verify a bundle written by write_bundle.
+
+    Output:
+    - manifest (dict) = format, model version and checksum
+    - members (dict) = raw bytes of every member
+    '''
+    with zipfile.ZipFile(bundle_path) as bundle:
+        manifest = json.loads(bundle.read('manifest.json'))
+        members = {name: bundle.read(name) for name in manifest['members']}
+
+    if manifest['format'] != BUNDLE_FORMAT:
+        raise ValueError(f"Unsupported bundle format {manifest['format']} in {bundle_path}")
+    if payload_checksum(members) != manifest['sha256']:
+        raise ValueError(f"Checksum mismatch, {bundle_path} is corrupted")
+
+    return manifest, members
+
+
+def lookup_table_from_bytes(data):
+    return PatternLookupTable.load(io.BytesIO(data))
+
+
+def cooccurrence_from_bytes(data):
+    return CooccurrenceIndex.load(io.BytesIO(data))
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+
+def symptom_key(row):
+    '''
+    Pack a 0/1 symptom row into a short bytes key (one bit per symptom)
+    '''
+    return np.packbits(np.asarray(row) != 0).tobytes()
+
+
+class PredictionCache:
+    '''
+    Bounded LRU cache of model outputs keyed by (model version, symptom bitmask).
+
+    Entries older than ttl seconds are treated as misses. All operations
+    take a lock, so one instance can be shared by every Streamlit session
+    in the process.
+    '''
+
+    def __init__(self, maxsize=4096, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if self.ttl is None or time.monotonic() - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
+
+
+@lru_cache(maxsize=None)
+def default_prediction_cache():
+    '''
+    Prediction cache shared by the whole process
+    '''
+    return PredictionCache()
@@ -0,0 +1,150 @@
+import time
+
+import numpy as np
+
+
+class BernoulliNaiveBayes:
+    '''
+    Bernoulli naive Bayes over 0/1 symptom vectors. Scoring a batch is one
+    matrix product: log P(disease | x) = x @ log_odds + bias (up to a constant).
+    '''
+
+    def __init__(self, log_odds, bias):
+        self.log_odds = log_odds
+        self.bias = bias
+
+    @classmethod
+    def fit(cls, X, y, n_classes, alpha=0.1):
+        X = np.asarray(X, dtype=np.float64)
+        Y = np.zeros((len(y), n_classes))
+        Y[np.arange(len(y)), y] = 1
+        counts = Y.sum(axis=0)
+        p = (X.T @ Y + alpha) / (counts + 2 * alpha)
+        log_prior = np.log((counts + alpha) / (counts.sum() + alpha * n_classes))
+        return cls(np.log(p) - np.log1p(-p), log_prior + np.log1p(-p).sum(axis=0))
+
+    def save(self, path):
+        np.savez(path, log_odds=self.log_odds, bias=self.bias)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['log_odds'], data['bias'])
+
+    def log_scores(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.log_odds + self.bias
+
+    def predict_proba(self, X):
+        scores = self.log_scores(X)
+        scores -= scores.max(axis=1, keepdims=True)
+        proba = np.exp(scores)
+        return proba / proba.sum(axis=1, keepdims=True)
+
+
+def log_margin(log_scores):
+    '''
+    Gap between the best and the second best class score of every row
+    '''
+    top2 = np.partition(log_scores, -2, axis=1)[:, -2:]
+    return top2[:, 1] - top2[:, 0]
+
+
+def calibrate_margin(margins, agrees, target_agreement=0.995):
+    '''
+    Smallest margin such that the rows at or above it agree with the full
+    model at least target_agreement of the time (inf when none do)
+    '''
+    order = np.argsort(-margins, kind='stable')
+    agreement = np.cumsum(agrees[order]) / np.arange(1, len(order) + 1)
+    passing = np.flatnonzero(agreement >= target_agreement)
+    if len(passing) == 0:
+        return np.inf
+    return float(margins[order[passing[-1]]])
+
+
+def partial_symptom_rows(X, keep_rates=(1.0, 0.8, 0.6, 0.4), copies=2, seed=0):
+    '''
+    Copies of the dataset rows with random symptoms left out, like the
+    incomplete symptom lists entered by users
+    '''
+    X = np.asarray(X, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    rows = np.vstack([X * (rng.random(X.shape) < keep) for keep in keep_rates for _ in range(copies)])
+    return rows[rows.sum(axis=1) > 0]
+
+
+class SymptomCascade:
+    '''
+    Two-stage symptom classifier. A naive Bayes first stage answers the
+    rows it is confident about (score margin of at least min_margin) and
+    only the remaining, ambiguous rows are sent to the full model.
+
+    The first stage is fitted to the answers of the full model (not the
+    dataset labels), so a confident first stage answer is the answer the
+    full model would have given.
+    '''
+
+    def __init__(self, first_stage, full_predict_proba, min_margin):
+        self.first_stage = first_stage
+        self.full_predict_proba = full_predict_proba
+        self.min_margin = min_margin
+
+    @classmethod
+    def train(cls, X, full_predict_proba, n_classes, target_agreement=0.995, seed=0):
+        '''
+        Fit the first stage on incomplete versions of the dataset rows
+        labelled by the full model, then pick min_margin on a second,
+        independent sample so the confident answers reach target_agreement
+        '''
+        fit_rows = partial_symptom_rows(X, seed=seed)
+        first_stage = BernoulliNaiveBayes.fit(fit_rows, full_predict_proba(fit_rows).argmax(axis=1), n_classes)
+
+        check_rows = partial_symptom_rows(X, seed=seed + 1)
+        log_scores = first_stage.log_scores(check_rows)
+        agrees = log_scores.argmax(axis=1) == full_predict_proba(check_rows).argmax(axis=1)
+        min_margin = calibrate_margin(log_margin(log_scores), agrees, target_agreement)
+        return cls(first_stage, full_predict_proba, min_margin)
+
+    def predict(self, X):
+        '''
+        Output:
+        - classes (np.array) = predicted class index per row
+        - probabilities (np.array) = full model probability of the predicted
+          class for the escalated rows, NaN for the rows the first stage
+          answered (naive Bayes scores are near 1 and not comparable)
+        - escalated (np.array) = True for the rows answered by the full model
+        '''
+        X = np.asarray(X.toarray() if hasattr(X, 'toarray') else X, dtype=np.float64)
+        log_scores = self.first_stage.log_scores(X)
+        classes = log_scores.argmax(axis=1)
+        escalated = log_margin(log_scores) < self.min_margin
+        probabilities = np.full(len(X), np.nan)
+        if escalated.any():
+            proba = self.full_predict_proba(X[escalated])
+            classes[escalated] = proba.argmax(axis=1)
+            probabilities[escalated] = proba.max(axis=1)
+        return classes, probabilities, escalated
+
+    def report(self, X):
+        '''
+        Escalation rate, agreement with the full model on every row and the
+        time both take on X
+        '''
+        X = np.asarray(X.toarray() if hasattr(X, 'toarray') else X, dtype=np.float64)
+
+        start = time.perf_counter()
+        classes, _, escalated = self.predict(X)
+        cascade_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        full_classes = self.full_predict_proba(X).argmax(axis=1)
+        full_seconds = time.perf_counter() - start
+
+        return {
+            'rows': len(X),
+            'min_margin': self.min_margin,
+            'escalation_rate': float(escalated.mean()) if len(X) else 0.0,
+            'agreement': float((classes == full_classes).mean()) if len(X) else 1.0,
+            'cascade_seconds': cascade_seconds,
+            'full_seconds': full_seconds,
+        }
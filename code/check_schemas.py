@@ -0,0 +1,54 @@
+# Run from the repository root: python -m code.check_schemas
+#
+# Checks every schema of code.schemas against the CSV its model was trained
+# on: the feature names must be the training columns in the same order, and
+# every value found in a categorical column must be accepted by its
+# encoding. Prints the problems and exits with status 1 if there are any.
+
+import sys
+
+import pandas as pd
+
+from code.columnar import read_frame
+from code.schemas import TABULAR_SCHEMAS, TRAINING_DATA
+
+
+def schema_problems(schema, frame, dropped=()):
+    '''
+    Differences between a schema and its training data
+
+    Output:
+    - problems (list) = one message per mismatch, empty when the schema matches
+    '''
+    columns = [column for column in frame.columns if column not in dropped]
+    if columns != schema.names:
+        return [f"features {schema.names} do not match the training columns {columns}"]
+
+    problems = []
+    for name in schema.names:
+        encoding = schema.encodings[name]
+        if encoding is None:
+            continue
+        unknown = sorted(str(value) for value in pd.unique(frame[name].dropna()) if not schema.accepts(name, value))
+        if unknown:
+            problems.append(f"{name} values {unknown} are not in its encoding {encoding}")
+    return problems
+
+
+def check_schemas(training_data=TRAINING_DATA):
+    problems = {}
+    for model_name, (path, dropped) in training_data.items():
+        found = schema_problems(TABULAR_SCHEMAS[model_name], read_frame(path), dropped)
+        if found:
+            problems[model_name] = found
+    return problems
+
+
+if __name__ == '__main__':
+    problems = check_schemas()
+    for model_name, found in problems.items():
+        for problem in found:
+            print(f"{model_name} ({TRAINING_DATA[model_name][0]}): {problem}")
+    if problems:
+        sys.exit(1)
+    print(f"{len(TRAINING_DATA)} schemas match their training data")
@@ -0,0 +1,146 @@
+import glob
+import os
+from functools import lru_cache
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+
+from code.artifacts import file_sha1
+
+STORE_DIR = 'data/columnar'
+# Bundled datasets, converted by build_columnar.py and described by build_manifest.py
+DATASET_PATTERNS = ('data/*.csv', 'data/*.tsv', 'Datasets/*.csv')
+
+
+def dataset_paths(patterns=DATASET_PATTERNS):
+    return sorted(path for pattern in patterns for path in glob.glob(pattern))
+
+
+def store_path(source_path, store_dir=STORE_DIR):
+    '''
+    Columnar file of a CSV/TSV dataset: Datasets/heart.csv -> data/columnar/Datasets/heart.arrow
+    '''
+    stem = os.path.splitext(os.path.normpath(source_path))[0]
+    return os.path.join(store_dir, stem + '.arrow')
+
+
+def read_source(source_path):
+    '''
+    Parse a CSV (or .tsv) with typed columns. Column names are stripped
+    (of spaces and byte order marks) and empty cells are nulls, as with
+    pandas.read_csv.
+    '''
+    delimiter = '\t' if source_path.endswith('.tsv') else ','
+    table = pa_csv.read_csv(source_path, parse_options=pa_csv.ParseOptions(delimiter=delimiter),
+                            convert_options=pa_csv.ConvertOptions(strings_can_be_null=True))
+    return table.rename_columns([name.lstrip('\ufeff').strip() for name in table.column_names])
+
+
+def narrow_integers(table):
+    '''
+    Store integer columns that fit in a byte (flags, 0/1 symptoms, codes) as uint8
+    '''
+    columns = []
+    for column in table.columns:
+        if pa.types.is_integer(column.type) and column.null_count == 0 and len(column):
+            values = column.to_numpy()
+            if values.min() >= 0 and values.max() <= 255:
+                column = pa.chunked_array([values.astype(np.uint8)])
+        columns.append(column)
+    return pa.table(columns, names=table.column_names)
+
+
+def convert_dataset(source_path, store_dir=STORE_DIR):
+    '''
+    Write the typed columnar copy of one dataset. The file is an
+    uncompressed Arrow IPC (Feather v2) file, so it can be memory-mapped and
+    its columns used without copying.
+    '''
+    table = narrow_integers(read_source(source_path))
+    metadata = {b'source_path': source_path.encode(), **source_signature(source_path)}
+    table = table.replace_schema_metadata(metadata)
+
+    path = store_path(source_path, store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    feather.write_feather(table, path, compression='uncompressed')
+    return path
+
+
+def source_signature(source_path):
+    stat = os.stat(source_path)
+    return {
+        b'source_size': str(stat.st_size).encode(),
+        b'source_mtime_ns': str(stat.st_mtime_ns).encode(),
+        b'source_sha1': file_sha1(source_path).encode(),
+    }
+
+
+def is_current(source_path, path):
+    '''
+    The columnar copy exists and was written from the same source content.
+    A different size means stale; the same size and modification time means
+    current; otherwise (an edit, or a fresh checkout) the content hashes decide.
+    The answer is cached per process until either file changes.
+    '''
+    if not os.path.exists(path):
+        return False
+    if not os.path.exists(source_path):
+        return True
+    source_stat, stat = os.stat(source_path), os.stat(path)
+    return _matches_source(source_path, source_stat.st_size, source_stat.st_mtime_ns,
+                           path, stat.st_size, stat.st_mtime_ns)
+
+
+@lru_cache(maxsize=None)
+def _matches_source(source_path, source_size, source_mtime_ns, path, size, mtime_ns):
+    # size and mtime_ns of the columnar file are only part of the cache key
+    with pa.memory_map(path) as source:
+        metadata = ipc.open_file(source).schema.metadata or {}
+    if metadata.get(b'source_size') != str(source_size).encode():
+        return False
+    if metadata.get(b'source_mtime_ns') == str(source_mtime_ns).encode():
+        return True
+    return metadata.get(b'source_sha1') == file_sha1(source_path).encode()
+
+
+def open_table(source_path, columns=None, store_dir=STORE_DIR):
+    '''
+    Dataset as a pyarrow Table, memory-mapped from its columnar copy and
+    projected to the given columns. Falls back to parsing the CSV when
+    there is no up to date columnar copy (run python -m code.build_columnar).
+    '''
+    path = store_path(source_path, store_dir)
+    if is_current(source_path, path):
+        table = ipc.open_file(pa.memory_map(path)).read_all()
+    else:
+        table = read_source(source_path)
+    return table.select(columns) if columns else table
+
+
+def read_frame(source_path, columns=None, store_dir=STORE_DIR):
+    '''
+    Dataset as a pandas DataFrame, only with the given columns
+    '''
+    return open_table(source_path, columns, store_dir).to_pandas()
+
+
+def read_matrix(source_path, columns, dtype=np.float64, store_dir=STORE_DIR):
+    '''
+    Given columns of a dataset as one (n_rows, n_columns) array
+    '''
+    table = open_table(source_path, columns, store_dir)
+    X = np.empty((table.num_rows, len(columns)), dtype=dtype)
+    for idx, name in enumerate(columns):
+        X[:, idx] = table.column(name).to_numpy()
+    return X
+
+
+def column_names(source_path, store_dir=STORE_DIR):
+    path = store_path(source_path, store_dir)
+    if is_current(source_path, path):
+        with pa.memory_map(path) as source:
+            return ipc.open_file(source).schema.names
+    return read_source(source_path).column_names
@@ -0,0 +1,217 @@
+import copy
+import json
+
+import numpy as np
+import xgboost as xgb
+
+# Leaf-value spreads tried from the most to the least aggressive
+DEFAULT_THRESHOLDS = (0.5, 0.2, 0.1, 0.05, 0.02, 0.01, 0.005, 0.001)
+
+TREE_ARRAYS = ('base_weights', 'default_left', 'left_children', 'loss_changes', 'parents',
+               'right_children', 'split_conditions', 'split_indices', 'split_type', 'sum_hessian')
+
+
+def model_to_dict(booster):
+    return json.loads(booster.save_raw('json'))
+
+
+def booster_from_dict(model_dict):
+    booster = xgb.Booster()
+    booster.load_model(bytearray(json.dumps(model_dict).encode()))
+    return booster
+
+
+def is_leaf(tree, node):
+    return tree['left_children'][node] == -1
+
+
+def leaf_tree(tree, value):
+    '''
+    Replace a tree by a single leaf holding value
+    '''
+    tree.update(
+        base_weights=[value], default_left=[0], left_children=[-1], loss_changes=[0.0],
+        parents=[2147483647], right_children=[-1], split_conditions=[value], split_indices=[0],
+        split_type=[0], sum_hessian=[sum(tree['sum_hessian'][:1])],
+        categories=[], categories_nodes=[], categories_segments=[], categories_sizes=[],
+    )
+    tree['tree_param']['num_nodes'] = '1'
+    tree['tree_param']['num_deleted'] = '0'
+
+
+def leaf_summary(tree):
+    '''
+    Leaf values of a tree and their hessian-weighted mean
+    '''
+    leaves = [node for node in range(len(tree['left_children'])) if is_leaf(tree, node)]
+    values = np.array([tree['split_conditions'][node] for node in leaves])
+    weights = np.array([tree['sum_hessian'][node] for node in leaves])
+    mean = float(np.average(values, weights=weights)) if weights.sum() > 0 else float(values.mean())
+    return values, mean
+
+
+def merge_sibling_leaves(tree, threshold):
+    '''
+    Turn every split whose two children are leaves with values closer than
+    threshold into a leaf, repeating until no such split is left.
+    Returns True if the tree changed.
+    '''
+    changed = False
+    merged = True
+    while merged:
+        merged = False
+        for node in range(len(tree['left_children'])):
+            left, right = tree['left_children'][node], tree['right_children'][node]
+            if left == -1 or not (is_leaf(tree, left) and is_leaf(tree, right)):
+                continue
+            left_value, right_value = tree['split_conditions'][left], tree['split_conditions'][right]
+            if abs(left_value - right_value) >= threshold:
+                continue
+            left_weight, right_weight = tree['sum_hessian'][left], tree['sum_hessian'][right]
+            total = left_weight + right_weight
+            value = (left_value * left_weight + right_value * right_weight) / total if total > 0 \
+                else (left_value + right_value) / 2
+            tree['left_children'][node] = tree['right_children'][node] = -1
+            tree['split_conditions'][node] = tree['base_weights'][node] = value
+            merged = changed = True
+
+    if changed:
+        drop_unreachable_nodes(tree)
+    return changed
+
+
+def drop_unreachable_nodes(tree):
+    # Breadth first from the root so parents keep smaller ids than children
+    order = [0]
+    for node in order:
+        if not is_leaf(tree, node):
+            order.extend([tree['left_children'][node], tree['right_children'][node]])
+    new_id = {old: new for new, old in enumerate(order)}
+
+    arrays = {name: [tree[name][old] for old in order] for name in TREE_ARRAYS}
+    arrays['left_children'] = [new_id.get(child, -1) for child in arrays['left_children']]
+    arrays['right_children'] = [new_id.get(child, -1) for child in arrays['right_children']]
+    arrays['parents'] = [new_id.get(parent, 2147483647) for parent in arrays['parents']]
+    tree.update(arrays)
+    tree['tree_param']['num_nodes'] = str(len(order))
+    tree['tree_param']['num_deleted'] = '0'
+
+
+def compact_trees(model_dict, threshold):
+    '''
+    Compaction pass over a multi-class model dict (returns a new dict):
+    - trees whose leaf values spread less than threshold become a constant
+    - constants are folded into the first tree of their class, so those
+      trees add nothing and rounds at the end that add nothing are dropped
+    - sibling leaves closer than threshold are merged into their parent
+    '''
+    model_dict = copy.deepcopy(model_dict)
+    learner = model_dict['learner']
+    gbtree = learner['gradient_booster']['model']
+    trees, tree_info = gbtree['trees'], gbtree['tree_info']
+    n_classes = int(learner['learner_model_param']['num_class'])
+
+    constants = np.zeros(n_classes)
+    first_tree = {}
+    for i, tree in enumerate(trees):
+        k = tree_info[i]
+        first_tree.setdefault(k, i)
+        values, mean = leaf_summary(tree)
+        if i != first_tree[k] and values.max() - values.min() < threshold:
+            constants[k] += mean
+            leaf_tree(tree, 0.0)
+        else:
+            merge_sibling_leaves(tree, threshold)
+
+    for k, i in first_tree.items():
+        tree = trees[i]
+        for node in range(len(tree['left_children'])):
+            if is_leaf(tree, node):
+                tree['split_conditions'][node] += constants[k]
+                tree['base_weights'][node] += constants[k]
+
+    # Drop trailing rounds made only of zero leaves
+    n_rounds = len(trees) // n_classes
+    while n_rounds > 1 and all(
+            tree['left_children'] == [-1] and tree['split_conditions'][0] == 0.0
+            for tree in trees[(n_rounds - 1) * n_classes:n_rounds * n_classes]):
+        n_rounds -= 1
+    n_trees = n_rounds * n_classes
+    del trees[n_trees:], tree_info[n_trees:]
+    for i, tree in enumerate(trees):
+        tree['id'] = i
+
+    gbtree['gbtree_model_param']['num_trees'] = str(n_trees)
+    if 'iteration_indptr' in gbtree:
+        gbtree['iteration_indptr'] = list(range(0, n_trees + 1, n_classes))
+    attributes = learner.get('attributes', {})
+    if 'best_iteration' in attributes:
+        attributes['best_iteration'] = str(n_rounds - 1)
+        attributes['best_ntree_limit'] = str(n_rounds)
+
+    return model_dict
+
+
+def model_size(model_dict):
+    trees = model_dict['learner']['gradient_booster']['model']['trees']
+    return {
+        'trees': len(trees),
+        'trees_with_splits': sum(tree['left_children'][0] != -1 for tree in trees),
+        'nodes': sum(len(tree['left_children']) for tree in trees),
+        'json_bytes': len(json.dumps(model_dict)),
+    }
+
+
+def compare_models(booster, compacted, X, y):
+    '''
+    Accuracy of both models on (X, y) and the largest change of any
+    predicted probability between them
+    '''
+    data = xgb.DMatrix(X, feature_names=booster.feature_names)
+    y = np.asarray(y)
+    proba_before, proba_after = booster.predict(data), compacted.predict(data)
+    return {
+        'accuracy_before': float((proba_before.argmax(axis=1) == y).mean()),
+        'accuracy_after': float((proba_after.argmax(axis=1) == y).mean()),
+        'max_probability_change': float(np.abs(proba_after - proba_before).max()),
+    }
+
+
+def compact_model(booster, X_val, y_val, max_accuracy_loss=0.0, max_probability_change=0.01,
+                  thresholds=DEFAULT_THRESHOLDS):
+    '''
+    Compact the ensemble as much as possible while the accuracy on the
+    held-out (X_val, y_val) drops by at most max_accuracy_loss and no
+    predicted probability moves by more than max_probability_change (None
+    to only check accuracy). The probabilities are shown to users, so the
+    default only allows changes of a percentage point.
+
+    Tries the thresholds from the most aggressive one and keeps the first
+    result within tolerance. Raises ValueError when none is, so no artifact
+    that loses more accuracy can be produced. (X_val, y_val) is used to
+    choose the threshold; check the result on a separate test set.
+
+    Output:
+    - booster (xgb.Booster) = compacted model
+    - report (dict) = threshold, accuracy and size before and after
+    '''
+    model_dict = model_to_dict(booster)
+
+    for threshold in sorted(thresholds, reverse=True):
+        compacted = booster_from_dict(compact_trees(model_dict, threshold))
+        comparison = compare_models(booster, compacted, X_val, y_val)
+        if max_probability_change is not None and comparison['max_probability_change'] > max_probability_change:
+            continue
+        if comparison['accuracy_before'] - comparison['accuracy_after'] <= max_accuracy_loss:
+            report = {
+                'threshold': threshold,
+                **comparison,
+                'before': model_size(model_dict),
+                'after': model_size(model_to_dict(compacted)),
+            }
+            return compacted, report
+
+    raise ValueError(
+        f"Every compaction threshold loses more than {max_accuracy_loss} accuracy on the held-out data"
+        " (or changes probabilities more than allowed), refusing to emit a compacted model"
+    )
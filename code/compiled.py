@@ -0,0 +1,240 @@
+import json
+
+import numpy as np
+
+
+class CompiledEnsemble:
+    '''
+    XGBoost multi-class tree ensemble compiled to flat NumPy arrays.
+
+    All trees are stored back to back: node i has a split feature, a
+    threshold, left/right children (global node ids, leaves point to
+    themselves) and a leaf value. Inference walks every tree for a whole
+    batch at once and never imports xgboost.
+    '''
+
+    def __init__(self, feature, threshold, left, right, default_left, value,
+                 roots, tree_class, tree_depth, n_classes, n_features,
+                 base_score, feature_names=None, model_version=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.tree_class = tree_class
+        self.n_classes = n_classes
+        self.n_features = n_features
+        self.tree_depth = tree_depth
+        self.base_score = base_score
+        self.max_depth = int(tree_depth.max(initial=0))
+        self.feature_names = feature_names
+        # model_version of the booster the arrays were compiled from, when known
+        self.model_version = model_version
+
+        # Binary fast path: for 0/1 inputs the next node only depends on
+        # whether the split feature is set, so precompute both children.
+        # A symptom that is present (1) goes left only if 1 < threshold.
+        # Stored interleaved so the child is a single lookup at 2 * node + bit.
+        next_if_zero = np.where(0 < threshold, left, right)
+        next_if_one = np.where(1 < threshold, left, right)
+        self.next_by_bit = np.stack([next_if_zero, next_if_one], axis=1).ravel()
+
+        # (n_trees, n_classes) one-hot of the class each tree votes for
+        self.class_matrix = np.zeros((len(roots), n_classes), dtype=np.float32)
+        self.class_matrix[np.arange(len(roots)), tree_class] = 1
+
+        # Trees sorted deepest first: at level d only the first
+        # level_width[d] trees still have splits left to walk. Trees that
+        # are a single leaf never need walking and are folded into a
+        # constant margin.
+        self.order = np.argsort(-tree_depth, kind='stable')
+        sorted_depth = tree_depth[self.order]
+        self.level_width = [int((sorted_depth > d).sum()) for d in range(self.max_depth)]
+        n_active = self.level_width[0] if self.max_depth else 0
+        active, constant = self.order[:n_active], self.order[n_active:]
+        self.active_roots = roots[active]
+        self.active_class_matrix = self.class_matrix[active]
+        self.constant_margin = base_score + value[roots[constant]] @ self.class_matrix[constant]
+
+    @classmethod
+    def from_json(cls, model_path):
+        with open(model_path) as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def load(cls, path):
+        '''
+        Load arrays written by save; nothing is parsed, so this is much
+        faster than compiling from the JSON model
+        '''
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        return cls(
+            feature=arrays['feature'],
+            threshold=arrays['threshold'],
+            left=arrays['left'],
+            right=arrays['right'],
+            default_left=arrays['default_left'],
+            value=arrays['value'],
+            roots=arrays['roots'],
+            tree_class=arrays['tree_class'],
+            tree_depth=arrays['tree_depth'],
+            n_classes=int(arrays['n_classes']),
+            n_features=int(arrays['n_features']),
+            base_score=float(arrays['base_score']),
+            feature_names=arrays['feature_names'].tolist() if 'feature_names' in arrays else None,
+            model_version=str(arrays['model_version']) if 'model_version' in arrays else None,
+        )
+
+    def save(self, path):
+        arrays = dict(
+            feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+            default_left=self.default_left, value=self.value, roots=self.roots,
+            tree_class=self.tree_class, tree_depth=self.tree_depth,
+            n_classes=self.n_classes, n_features=self.n_features, base_score=self.base_score,
+        )
+        if self.feature_names is not None:
+            arrays['feature_names'] = np.asarray(self.feature_names)
+        if self.model_version is not None:
+            arrays['model_version'] = np.asarray(self.model_version)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def from_booster(cls, booster):
+        compiled = cls.from_dict(json.loads(booster.save_raw('json')))
+        compiled.model_version = booster.attr('model_version')
+        return compiled
+
+    @classmethod
+    def from_dict(cls, model_dict):
+        learner = model_dict['learner']
+        objective = learner['objective']['name']
+        if objective not in ('multi:softprob', 'multi:softmax'):
+            raise ValueError(f"Unsupported objective for compilation: {objective}")
+
+        params = learner['learner_model_param']
+        n_classes = int(params['num_class'])
+        n_features = int(params['num_feature'])
+        base_score = float(params['base_score'])
+
+        model = learner['gradient_booster']['model']
+        trees = model['trees']
+        tree_class = np.asarray(model['tree_info'], dtype=np.int32)
+
+        feature, threshold, left, right, default_left, value, roots, tree_depth = [], [], [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            if any(tree['split_type']):
+                raise ValueError("Categorical splits are not supported")
+
+            tree_left = np.asarray(tree['left_children'], dtype=np.int64)
+            tree_right = np.asarray(tree['right_children'], dtype=np.int64)
+            is_leaf = tree_left == -1
+            node_ids = np.arange(len(tree_left)) + offset
+
+            feature.append(np.where(is_leaf, 0, tree['split_indices']))
+            threshold.append(np.where(is_leaf, np.inf, tree['split_conditions']))
+            left.append(np.where(is_leaf, node_ids, tree_left + offset))
+            right.append(np.where(is_leaf, node_ids, tree_right + offset))
+            default_left.append(np.asarray(tree['default_left'], dtype=bool))
+            value.append(np.where(is_leaf, tree['split_conditions'], 0.0))
+            roots.append(offset)
+
+            tree_depth.append(_tree_depth(tree_left, tree_right))
+            offset += len(tree_left)
+
+        return cls(
+            feature=np.concatenate(feature).astype(np.int32),
+            threshold=np.concatenate(threshold).astype(np.float32),
+            left=np.concatenate(left).astype(np.int32),
+            right=np.concatenate(right).astype(np.int32),
+            default_left=np.concatenate(default_left),
+            value=np.concatenate(value).astype(np.float32),
+            roots=np.asarray(roots, dtype=np.int32),
+            tree_class=tree_class,
+            tree_depth=np.asarray(tree_depth, dtype=np.int32),
+            n_classes=n_classes,
+            n_features=n_features,
+            base_score=base_score,
+            feature_names=learner.get('feature_names') or None,
+        )
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def active_leaves(self, X, binary=None):
+        '''
+        Leaf node id reached in every tree that has at least one split,
+        shape (n_rows, n_active_trees), in the order of active_roots
+        '''
+        X = np.asarray(X)
+        if binary is None:
+            binary = X.dtype == bool or bool(np.isin(X, (0, 1)).all())
+
+        nodes = np.broadcast_to(self.active_roots, (len(X), len(self.active_roots))).copy()
+
+        if binary:
+            bits = X.astype(np.int32).ravel()
+            row_offset = (np.arange(len(X), dtype=np.int64) * X.shape[1])[:, None]
+            for width in self.level_width:
+                level = nodes[:, :width]
+                bit = bits[row_offset + self.feature[level]]
+                nodes[:, :width] = self.next_by_bit[2 * level + bit]
+            return nodes
+
+        X = X.astype(np.float32)
+        rows = np.arange(len(X))[:, None]
+        for width in self.level_width:
+            level = nodes[:, :width]
+            x = X[rows, self.feature[level]]
+            go_left = np.where(np.isnan(x), self.default_left[level], x < self.threshold[level])
+            nodes[:, :width] = np.where(go_left, self.left[level], self.right[level])
+        return nodes
+
+    def predict_margin(self, X, binary=None, batch_size=1024):
+        X = np.asarray(X)
+        margins = np.empty((len(X), self.n_classes), dtype=np.float64)
+        margins[:] = self.constant_margin
+        for start in range(0, len(X), batch_size):
+            leaf_values = self.value[self.active_leaves(X[start:start + batch_size], binary)]
+            # Sum the leaf values of the trees belonging to each class
+            margins[start:start + batch_size] += leaf_values @ self.active_class_matrix
+        return margins
+
+    def predict_proba(self, X, binary=None, batch_size=1024):
+        margins = self.predict_margin(X, binary, batch_size)
+        margins -= margins.max(axis=1, keepdims=True)
+        proba = np.exp(margins)
+        proba /= proba.sum(axis=1, keepdims=True)
+        return proba
+
+    def predict(self, X, binary=None, batch_size=1024):
+        return self.predict_proba(X, binary, batch_size).argmax(axis=1)
+
+
+def _tree_depth(left, right):
+    depth = np.zeros(len(left), dtype=np.int64)
+    # Children always have larger ids than their parent in XGBoost trees
+    for node in range(len(left)):
+        if left[node] != -1:
+            depth[left[node]] = depth[node] + 1
+            depth[right[node]] = depth[node] + 1
+    return int(depth.max())
+
+
+def max_abs_error(compiled, model, X):
+    '''
+    Largest absolute difference between the compiled ensemble and the
+    xgboost model predict_proba on X
+    '''
+    return float(np.abs(compiled.predict_proba(X) - model.predict_proba(X)).max())
+
+
+def check_compiled(compiled, model, X, atol=1e-5):
+    error = max_abs_error(compiled, model, X)
+    if error > atol:
+        raise ValueError(f"Compiled ensemble differs from the xgboost model by {error:.2e} (tolerance {atol:.0e})")
+    return error
@@ -0,0 +1,96 @@
+import numpy as np
+
+
+class CooccurrenceIndex:
+    '''
+    Symptom x symptom and symptom x disease co-occurrence counts of the
+    training set, used to suggest which symptom to ask about next.
+
+    Built once at train time; every suggestion is a handful of vectorized
+    operations over these small matrices and never re-scans the dataset.
+    '''
+
+    def __init__(self, symptom_symptom, symptom_disease, disease_counts, alpha=1.0):
+        self.symptom_symptom = symptom_symptom
+        self.symptom_disease = symptom_disease
+        self.disease_counts = disease_counts
+        self.alpha = alpha
+
+        # Smoothed P(symptom | disease) and log prior of every disease
+        counts = symptom_disease.astype(np.float64)
+        self.p_symptom = (counts + alpha) / (disease_counts + 2 * alpha)
+        self.log_p_symptom = np.log(self.p_symptom)
+        self.log_prior = np.log((disease_counts + alpha) / (disease_counts.sum() + alpha * len(disease_counts)))
+
+    @classmethod
+    def build(cls, X, y, n_classes):
+        '''
+        X is the (n, n_symptoms) multi-hot matrix, y the disease code per row
+        '''
+        X = np.asarray(X, dtype=np.float64)
+        Y = np.zeros((len(y), n_classes))
+        Y[np.arange(len(y)), y] = 1
+        return cls(
+            symptom_symptom=(X.T @ X).astype(np.uint32),
+            symptom_disease=(X.T @ Y).astype(np.uint32),
+            disease_counts=Y.sum(axis=0).astype(np.uint32),
+        )
+
+    def save(self, path):
+        np.savez_compressed(path, symptom_symptom=self.symptom_symptom,
+                            symptom_disease=self.symptom_disease, disease_counts=self.disease_counts)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['symptom_symptom'], data['symptom_disease'], data['disease_counts'])
+
+    def disease_posterior(self, selected):
+        '''
+        Naive Bayes P(disease | selected symptoms)
+        '''
+        log_posterior = self.log_prior + self.log_p_symptom[selected].sum(axis=0)
+        posterior = np.exp(log_posterior - log_posterior.max())
+        return posterior / posterior.sum()
+
+    def suggest(self, selected, k=5):
+        '''
+        Symptoms worth asking about next, given the selected symptom indices.
+
+        Candidates are the symptoms seen together with every selected one.
+        They are ranked by expected information gain on the disease, i.e.
+        how much knowing whether the patient has them would narrow down
+        the diagnosis.
+
+        Output:
+        - list of (symptom index, information gain in bits), best first
+        '''
+        selected = np.asarray(list(selected), dtype=np.int64)
+        n_symptoms = len(self.symptom_symptom)
+
+        candidates = np.ones(n_symptoms, dtype=bool)
+        if len(selected):
+            candidates &= (self.symptom_symptom[selected] > 0).all(axis=0)
+            candidates[selected] = False
+        candidates = np.flatnonzero(candidates)
+        if len(candidates) == 0:
+            return []
+
+        posterior = self.disease_posterior(selected)
+        p_yes_given_d = self.p_symptom[candidates]
+        joint_yes = p_yes_given_d * posterior
+        joint_no = (1 - p_yes_given_d) * posterior
+        p_yes = joint_yes.sum(axis=1)
+        p_no = joint_no.sum(axis=1)
+
+        gain = entropy(posterior[None, :]) \
+            - p_yes * entropy(joint_yes / p_yes[:, None]) \
+            - p_no * entropy(joint_no / p_no[:, None])
+
+        order = np.argsort(-gain, kind='stable')[:k]
+        return list(zip(candidates[order].tolist(), gain[order].tolist()))
+
+
+def entropy(p):
+    p = np.clip(p, 1e-12, 1)
+    return -(p * np.log2(p)).sum(axis=-1)
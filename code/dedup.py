@@ -0,0 +1,29 @@
+import numpy as np
+
+
+def deduplicate_rows(X, y, sample_weight=None):
+    '''
+    Collapse identical (features, label) rows into one row each, weighted
+    by how many times it appeared (or by the sum of the given weights).
+
+    Boosting only ever sums gradient statistics over rows, so fitting on
+    the unique rows with these weights grows the same trees as fitting on
+    every duplicate.
+
+    Output:
+    - X_unique, y_unique (np.array) = one row per distinct (features, label)
+    - weights (np.array) = total weight of each distinct row
+    '''
+    X = np.asarray(X)
+    y = np.asarray(y)
+    rows = np.ascontiguousarray(np.column_stack([X, y]))
+    # View each row as one opaque value so np.unique compares whole rows
+    row_view = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+    _, first, inverse = np.unique(row_view, return_index=True, return_inverse=True)
+
+    if sample_weight is None:
+        weights = np.bincount(inverse).astype(np.float64)
+    else:
+        weights = np.bincount(inverse, weights=np.asarray(sample_weight, dtype=np.float64))
+
+    return X[first], y[first], weights
@@ -0,0 +1,188 @@
+import re
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Filler words dropped from free text (and from the aliases, so both sides match)
+STOP_WORDS = frozenset([
+    'i', 'im', 'ive', 'me', 'my', 'a', 'an', 'the', 'have', 'has', 'had', 'having', 'got',
+    'is', 'am', 'are', 'been', 'some', 'very', 'really', 'bit', 'little', 'since', 'today',
+    'yesterday', 'days', 'also', 'bad', 'severe', 'slightly', 'feel', 'feeling', 'feels',
+])
+
+# Separators between the symptoms of one intake note
+PHRASE_SPLIT = re.compile(r'[,;.:!?\n/+&]|\band\b|\bwith\b|\bplus\b|\balso\b|\bbut\b')
+
+# A phrase starting with one of these reports a symptom the patient does not have
+NEGATION_CUES = frozenset([
+    'no', 'not', 'nor', 'none', 'never', 'without', 'deny', 'denies', 'denied',
+    'dont', 'doesnt', 'didnt', 'havent', 'hasnt', 'isnt', 'arent',
+])
+
+
+def normalize(text):
+    '''
+    Lower case, underscores to spaces, only letters, digits and single spaces left
+    '''
+    text = re.sub(r'[^a-z0-9 ]', '', str(text).lower().replace('_', ' ').replace('-', ' '))
+    return ' '.join(word for word in text.split() if word not in STOP_WORDS)
+
+
+def is_negated(phrase):
+    '''
+    The phrase denies a symptom rather than reporting it
+
+    >>> is_negated('no fever'), is_negated("I don't have a cough"), is_negated('denies chest pain')
+    (True, True, True)
+    >>> is_negated('fever'), is_negated('nose bleeding')
+    (False, False)
+    '''
+    words = normalize(phrase).split()
+    return bool(words) and words[0] in NEGATION_CUES
+
+
+def trigrams(text):
+    '''
+    Character trigrams of normalized text, padded so word starts and ends count
+    '''
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SymptomMatcher:
+    '''
+    Maps free text ("stomach ache", "skin rash", "throwing up") to
+    vocabulary symptoms.
+
+    Every symptom name and synonym ("alias") is broken into character
+    trigrams once, into a sparse alias x trigram matrix. Scoring a batch of
+    texts is then one sparse product giving the shared trigram counts of
+    every (text, alias) pair, turned into a Dice similarity and reduced to
+    the best alias of every symptom.
+    '''
+
+    def __init__(self, vocabulary, synonyms=None, min_score=0.45):
+        self.vocabulary = vocabulary
+        self.min_score = min_score
+
+        aliases = [(normalize(symptom), idx) for idx, symptom in enumerate(vocabulary.symptoms)]
+        for synonym, symptom in (synonyms or {}).items():
+            if symptom in vocabulary:
+                aliases.append((normalize(synonym), vocabulary.index[symptom]))
+        # Sorted by symptom so the per-symptom best alias is one reduceat
+        aliases.sort(key=lambda alias: alias[1])
+        self.aliases = [text for text, _ in aliases]
+        self.alias_symptom = np.array([idx for _, idx in aliases], dtype=np.int64)
+        self.symptom_start = np.searchsorted(self.alias_symptom, np.arange(vocabulary.width))
+
+        self.trigram_index = {}
+        rows, cols = [], []
+        for alias, text in enumerate(self.aliases):
+            for trigram in trigrams(text):
+                rows.append(alias)
+                cols.append(self.trigram_index.setdefault(trigram, len(self.trigram_index)))
+        self.alias_trigrams = sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(self.aliases), len(self.trigram_index)),
+        )
+        self.alias_sizes = np.asarray(self.alias_trigrams.sum(axis=1), dtype=np.float32).ravel()
+
+    @classmethod
+    def from_csv(cls, vocabulary, synonyms_path='data/symptom_synonyms.csv', min_score=0.45):
+        return cls(vocabulary, read_synonyms(synonyms_path), min_score=min_score)
+
+    def query_matrix(self, texts):
+        '''
+        Sparse (n_texts, n_trigrams) matrix of the known trigrams of every
+        text, and the total trigram count of every text (unknown ones included)
+        '''
+        rows, cols = [], []
+        sizes = np.zeros(len(texts), dtype=np.float32)
+        for row, text in enumerate(texts):
+            grams = trigrams(normalize(text))
+            sizes[row] = len(grams)
+            for trigram in grams:
+                col = self.trigram_index.get(trigram)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+
+        query = sp.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(texts), len(self.trigram_index)),
+        )
+        return query, sizes
+
+    def scores(self, texts):
+        '''
+        Similarity of every text to every symptom
+
+        Output:
+        - scores (np.array) = (n_texts, n_symptoms) Dice similarity in [0, 1]
+        '''
+        query, sizes = self.query_matrix(texts)
+        shared = (query @ self.alias_trigrams.T).toarray()
+        dice = 2 * shared / np.maximum(sizes[:, None] + self.alias_sizes[None, :], 1)
+        return np.maximum.reduceat(dice, self.symptom_start, axis=1)
+
+    def candidates(self, text, k=5):
+        '''
+        Ranked symptoms for one piece of free text
+
+        Output:
+        - list of (symptom, score) above min_score, best first
+        '''
+        scores = self.scores([text])[0]
+        order = np.argsort(-scores, kind='stable')[:k]
+        return [(self.vocabulary.symptoms[idx], float(scores[idx]))
+                for idx in order if scores[idx] >= self.min_score]
+
+    def match(self, texts):
+        '''
+        Best symptom for every text, None where nothing is similar enough
+        '''
+        scores = self.scores(texts)
+        best = scores.argmax(axis=1)
+        best_score = scores[np.arange(len(texts)), best]
+        return [self.vocabulary.symptoms[idx] if score >= self.min_score else None
+                for idx, score in zip(best.tolist(), best_score.tolist())]
+
+    def resolve_notes(self, notes):
+        '''
+        Symptoms mentioned in every intake note. Notes are split into
+        phrases ("fever, headache and throwing up") and all phrases of all
+        notes are scored in one batch. Negated phrases ("no fever", "denies
+        chest pain") are left out.
+
+        Output:
+        - list of symptom lists, one per note, in order of mention
+        '''
+        phrases, owners = [], []
+        for note_idx, note in enumerate(notes):
+            for phrase in PHRASE_SPLIT.split(str(note).lower()):
+                if normalize(phrase) and not is_negated(phrase):
+                    phrases.append(phrase)
+                    owners.append(note_idx)
+
+        resolved = [[] for _ in notes]
+        if not phrases:
+            return resolved
+        for note_idx, symptom in zip(owners, self.match(phrases)):
+            if symptom is not None and symptom not in resolved[note_idx]:
+                resolved[note_idx].append(symptom)
+        return resolved
+
+    def encode_notes(self, notes, sparse=False):
+        '''
+        Multi-hot symptom matrix of a batch of intake notes, ready for the model
+        '''
+        return self.vocabulary.encode_batch(self.resolve_notes(notes), sparse=sparse)
+
+
+def read_synonyms(synonyms_path='data/symptom_synonyms.csv'):
+    '''
+    Lay terms for the vocabulary symptoms as a {synonym: symptom} dict
+    '''
+    df = pd.read_csv(synonyms_path)
+    return dict(zip(df['Synonym'].str.strip(), df['Symptom'].str.strip()))
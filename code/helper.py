@@ -1,20 +1,41 @@
-import pandas as pd
-import numpy as np
+from functools import lru_cache
 
+from code.vocabulary import SymptomVocabulary
 
-def prepare_symptoms_array(symptoms):
+
+@lru_cache(maxsize=None)
+def default_vocabulary():
+    '''
+    Symptom vocabulary read once per process from the clean dataset header
     '''
-    Convert a list of symptoms to a ndim(X) (in this case 131) that matches the
+    return SymptomVocabulary.from_tsv('data/clean_dataset.tsv')
+
+
+def prepare_symptoms_array(symptoms, vocabulary=None):
+    '''
+    Convert a list of symptoms to a ndim(X) (in this case 133) that matches the
     dataframe used to train the machine learning model
 
+    Pass the vocabulary of the loaded model (DiseaseModel.vocabulary) so the
+    width follows the model; otherwise the dataset header is used.
+
     Output:
     - X (np.array) = X values ready as input to ML model to get prediction
     '''
-    symptoms_array = np.zeros((1,133))
-    df = pd.read_csv('data/clean_dataset.tsv', sep='\t')
-    
-    for symptom in symptoms:
-        symptom_idx = df.columns.get_loc(symptom)
-        symptoms_array[0, symptom_idx] = 1
-
-    return symptoms_array
\ No newline at end of file
+    if vocabulary is None:
+        vocabulary = default_vocabulary()
+
+    return vocabulary.encode(symptoms)
+
+
+def prepare_symptoms_batch(symptom_lists, vocabulary=None, sparse=False):
+    '''
+    Convert many lists of symptoms to a multi-hot matrix, one row per list
+
+    Output:
+    - X (np.array or scipy.sparse.csr_matrix) = rows ready as input to ML model
+    '''
+    if vocabulary is None:
+        vocabulary = default_vocabulary()
+
+    return vocabulary.encode_batch(symptom_lists, sparse=sparse)
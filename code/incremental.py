@@ -0,0 +1,88 @@
+import numpy as np
+
+from code.lookup import topk_arrays
+
+
+class IncrementalScorer:
+    '''
+    Keeps the class margins of one symptom vector up to date while single
+    symptoms are switched on and off.
+
+    The leaf reached in every tree is cached. Toggling a symptom only
+    re-walks the trees that split on it and adds the change of their leaf
+    values to the margins, instead of scoring the whole ensemble again.
+    Built on a CompiledEnsemble; one scorer holds the state of one user.
+    '''
+
+    def __init__(self, engine, labels=None):
+        self.engine = engine
+        self.labels = labels
+
+        n_active = len(engine.active_roots)
+        active_trees = engine.order[:n_active]
+        self.tree_class = engine.tree_class[active_trees]
+
+        # For every symptom, the active trees that split on it (CSR layout)
+        tree_sizes = np.diff(np.append(engine.roots, len(engine.feature)))
+        pairs = set()
+        for tree, global_tree in enumerate(active_trees):
+            start = engine.roots[global_tree]
+            nodes = np.arange(start, start + tree_sizes[global_tree])
+            split_nodes = nodes[engine.left[nodes] != nodes]
+            pairs.update((int(feature), tree) for feature in engine.feature[split_nodes])
+        pairs = np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+        self.trees_by_feature = pairs[:, 1]
+        self.feature_indptr = np.searchsorted(pairs[:, 0], np.arange(engine.n_features + 1))
+        # Deepest tree among those splitting on each symptom bounds the re-walk
+        self.depth_by_feature = np.zeros(engine.n_features, dtype=np.int64)
+        np.maximum.at(self.depth_by_feature, pairs[:, 0], engine.tree_depth[active_trees][pairs[:, 1]])
+
+        self.reset()
+
+    def reset(self, bits=None):
+        '''
+        Recompute everything from scratch for the given 0/1 vector (all zeros by default)
+        '''
+        self.bits = np.zeros(self.engine.n_features, dtype=np.int32) if bits is None \
+            else np.asarray(bits, dtype=np.int32).copy()
+        self.leaves = self.engine.active_leaves(self.bits[None, :], binary=True)[0]
+        self.margins = self.engine.predict_margin(self.bits[None, :], binary=True)[0]
+
+    def toggle(self, feature):
+        self.bits[feature] ^= 1
+        trees = self.trees_by_feature[self.feature_indptr[feature]:self.feature_indptr[feature + 1]]
+        if len(trees) == 0:
+            return
+
+        engine = self.engine
+        nodes = engine.active_roots[trees]
+        for _ in range(self.depth_by_feature[feature]):
+            nodes = engine.next_by_bit[2 * nodes + self.bits[engine.feature[nodes]]]
+
+        delta = engine.value[nodes].astype(np.float64) - engine.value[self.leaves[trees]]
+        self.leaves[trees] = nodes
+        np.add.at(self.margins, self.tree_class[trees], delta)
+
+    def set_symptoms(self, features):
+        '''
+        Move to the vector with exactly these symptom indices set, toggling
+        only the symptoms that changed
+        '''
+        target = np.zeros_like(self.bits)
+        target[list(features)] = 1
+        for feature in np.flatnonzero(target != self.bits):
+            self.toggle(feature)
+
+    def proba(self):
+        margins = self.margins - self.margins.max()
+        proba = np.exp(margins)
+        return proba / proba.sum()
+
+    def topk(self, k=3):
+        '''
+        k most likely classes, best first, as [(label, probability), ...]
+        (class indices when the scorer has no labels)
+        '''
+        top_idx, top_prob = topk_arrays(self.proba()[None, :], k)
+        names = top_idx[0] if self.labels is None else np.asarray(self.labels)[top_idx[0]]
+        return list(zip(names.tolist(), top_prob[0].tolist()))
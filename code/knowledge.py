@@ -0,0 +1,50 @@
+from functools import lru_cache
+
+import pandas as pd
+
+
+class DiseaseKnowledgeBase:
+    '''
+    Disease descriptions and precautions held in memory.
+
+    Both tables are read and normalised once, then every lookup is a dict
+    access keyed by the disease name.
+    '''
+
+    def __init__(self, descriptions, precautions):
+        self.descriptions = descriptions
+        self.precautions = precautions
+
+    @classmethod
+    def from_csv(cls, description_path='data/symptom_Description.csv',
+                 precaution_path='data/symptom_precaution.csv'):
+        desc_df = pd.read_csv(description_path)
+        desc_df = desc_df.apply(lambda col: col.str.strip())
+        descriptions = dict(zip(desc_df['Disease'], desc_df['Description']))
+
+        prec_df = pd.read_csv(precaution_path)
+        prec_df = prec_df.apply(lambda col: col.str.strip()).fillna('')
+        precaution_values = prec_df.filter(regex='Precaution').values.tolist()
+        precautions = dict(zip(prec_df['Disease'], precaution_values))
+
+        return cls(descriptions, precautions)
+
+    def describe(self, disease_name):
+        return self.descriptions.get(disease_name)
+
+    def disease_precautions(self, disease_name):
+        return self.precautions.get(disease_name)
+
+    def describe_many(self, disease_names):
+        return [self.descriptions.get(name) for name in disease_names]
+
+    def precautions_many(self, disease_names):
+        return [self.precautions.get(name) for name in disease_names]
+
+
+@lru_cache(maxsize=None)
+def default_knowledge_base():
+    '''
+    Knowledge base read once per process from the data folder
+    '''
+    return DiseaseKnowledgeBase.from_csv()
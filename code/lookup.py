@@ -0,0 +1,85 @@
+import numpy as np
+
+
+class PatternLookupTable:
+    '''
+    Precomputed top-k predictions for every symptom pattern seen in training.
+
+    Patterns are stored as packed bitmasks (one bit per symptom) and looked
+    up through a dict, so a known pattern costs a single hash lookup.
+    '''
+
+    def __init__(self, keys, top_idx, top_prob, model_version):
+        self.keys = keys
+        self.top_idx = top_idx
+        self.top_prob = top_prob
+        self.model_version = model_version
+        self.index = {key.tobytes(): row for row, key in enumerate(keys)}
+
+    @property
+    def k(self):
+        return self.top_idx.shape[1]
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, disease_model, X, k=5):
+        '''
+        Run the model once over every distinct row of X and keep the k
+        most likely diseases per pattern
+        '''
+        patterns = np.unique(np.asarray(X) != 0, axis=0)
+        probabilities = disease_model.model_predict_proba(patterns.astype(np.float32))
+        top_idx, top_prob = topk_arrays(probabilities, k)
+
+        return cls(
+            keys=np.packbits(patterns, axis=1),
+            top_idx=top_idx.astype(np.int16),
+            top_prob=top_prob.astype(np.float32),
+            model_version=disease_model.model_version,
+        )
+
+    def save(self, path):
+        np.savez_compressed(path, keys=self.keys, top_idx=self.top_idx,
+                            top_prob=self.top_prob, model_version=self.model_version)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['keys'], data['top_idx'], data['top_prob'], str(data['model_version']))
+
+    def lookup(self, X, k):
+        '''
+        Output:
+        - found (np.array of bool) = rows answered by the table
+        - top_idx, top_prob (np.array) = k best classes per row, zero where not found
+        '''
+        X = np.asarray(X)
+        found = np.zeros(len(X), dtype=bool)
+        top_idx = np.zeros((len(X), k), dtype=np.int64)
+        top_prob = np.zeros((len(X), k))
+
+        # Only 0/1 rows can be patterns of the table
+        binary = ((X == 0) | (X == 1)).all(axis=1)
+        packed = np.packbits(X != 0, axis=1)
+        for i in np.flatnonzero(binary):
+            row = self.index.get(packed[i].tobytes())
+            if row is not None:
+                found[i] = True
+                top_idx[i] = self.top_idx[row, :k]
+                top_prob[i] = self.top_prob[row, :k]
+
+        return found, top_idx, top_prob
+
+
+def topk_arrays(disease_probability_array, k):
+    '''
+    Indices and probabilities of the k largest values per row, best first
+    '''
+    k = min(k, disease_probability_array.shape[1])
+    # argpartition picks the k best per row, then only those k get sorted
+    top_idx = np.argpartition(-disease_probability_array, k - 1, axis=1)[:, :k]
+    top_prob = np.take_along_axis(disease_probability_array, top_idx, axis=1)
+    order = np.argsort(-top_prob, axis=1, kind='stable')
+    return np.take_along_axis(top_idx, order, axis=1), np.take_along_axis(top_prob, order, axis=1)
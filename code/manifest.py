@@ -0,0 +1,52 @@
+import json
+from functools import lru_cache
+
+
+class DatasetManifest:
+    '''
+    Column metadata of the bundled datasets written by build_manifest.py:
+    row counts, category vocabularies and numeric ranges. Pages read their
+    choices and input bounds from here instead of parsing the CSV files.
+    '''
+
+    def __init__(self, datasets):
+        self.datasets = datasets
+
+    @classmethod
+    def from_json(cls, manifest_path='data/dataset_manifest.json'):
+        with open(manifest_path) as f:
+            return cls(json.load(f)['datasets'])
+
+    def column(self, dataset, column):
+        try:
+            return self.datasets[dataset]['columns'][column]
+        except KeyError:
+            raise KeyError(f"{dataset}:{column} is not in the dataset manifest, rerun code.build_manifest") from None
+
+    def rows(self, dataset):
+        return self.datasets[dataset]['rows']
+
+    def categories(self, dataset, column):
+        '''
+        Distinct values of a column, sorted
+        '''
+        info = self.column(dataset, column)
+        return info['categories'] if info['type'] == 'category' else info['values']
+
+    def bounds(self, dataset, column):
+        '''
+        (min, max) of a numeric column
+        '''
+        info = self.column(dataset, column)
+        return info['min'], info['max']
+
+    def quantile(self, dataset, column, q):
+        return self.column(dataset, column)['quantiles'][str(q)]
+
+
+@lru_cache(maxsize=None)
+def default_dataset_manifest():
+    '''
+    Dataset manifest read once per process
+    '''
+    return DatasetManifest.from_json()
@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from functools import lru_cache
+
+import joblib
+
+from code.DiseaseModel import DiseaseModel
+from code.cache import default_prediction_cache
+
+
+class ModelRegistry:
+    '''
+    Loads each model the first time it is asked for and keeps that single
+    instance for the rest of the process.
+
+    Streamlit re-runs app.py on every interaction but imported modules stay
+    loaded, so a registry held at module level is shared by every session.
+    Shared models must only be used through methods that do not modify
+    them (e.g. DiseaseModel.predict_batch instead of DiseaseModel.predict).
+    '''
+
+    def __init__(self):
+        self._loaders = {}
+        self._models = {}
+        self._stats = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        # Loads running now and loads started so far, to flag overlapping loads
+        self._active_loads = 0
+        self._started_loads = 0
+
+    def register(self, name, loader):
+        with self._lock:
+            self._loaders[name] = loader
+            self._locks[name] = threading.Lock()
+
+    def __contains__(self, name):
+        return name in self._loaders
+
+    def names(self):
+        return list(self._loaders)
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        if name not in self._loaders:
+            raise KeyError(f"No model registered as {name!r}")
+
+        # One lock per model: two sessions asking for the same model wait
+        # for a single load, other models keep loading in parallel
+        with self._locks[name]:
+            if name not in self._models:
+                self._models[name] = self._timed_load(name)
+        return self._models[name]
+
+    def _timed_load(self, name):
+        with self._lock:
+            overlapped = self._active_loads > 0
+            self._active_loads += 1
+            self._started_loads += 1
+            started_loads = self._started_loads
+        start_memory = resident_bytes()
+        start = time.perf_counter()
+
+        try:
+            model = self._loaders[name]()
+        finally:
+            load_seconds = time.perf_counter() - start
+            end_memory = resident_bytes()
+            with self._lock:
+                self._active_loads -= 1
+                overlapped = overlapped or self._started_loads != started_loads
+        memory_bytes = None if start_memory is None or end_memory is None else end_memory - start_memory
+
+        self._stats[name] = {'load_seconds': load_seconds, 'memory_bytes': memory_bytes,
+                             'memory_approximate': overlapped}
+        return model
+
+    def stats(self):
+        '''
+        Load time and growth of the process resident memory while loading,
+        per loaded model. Native allocations (e.g. the XGBoost booster) are
+        included; memory_bytes is None where the resident size is unknown.
+        When other loads ran at the same time their memory is counted too,
+        and memory_approximate is True.
+        '''
+        return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+def resident_bytes():
+    '''
+    Current resident memory of the process, None where /proc is not available
+    '''
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def load_symptom_model(model_path='model/xgboost_model.json', table_path='model/symptom_lookup.npz',
+                       cooccurrence_path='model/symptom_cooccurrence.npz', bundle_path='model/symptom_bundle.zip'):
+    if os.path.exists(bundle_path):
+        disease_model = DiseaseModel.from_bundle(bundle_path, cache=default_prediction_cache())
+    else:
+        disease_model = DiseaseModel(cache=default_prediction_cache())
+        disease_model.load_xgboost(model_path)
+        if os.path.exists(table_path):
+            disease_model.load_lookup_table(table_path)
+        if os.path.exists(cooccurrence_path):
+            disease_model.load_cooccurrence(cooccurrence_path)
+
+    # Compiled and given its matcher and severity weights up front, so
+    # sessions never modify the shared instance later
+    disease_model.compile_model()
+    disease_model.symptom_matcher()
+    disease_model.severity_scorer()
+    return disease_model
+
+
+TABULAR_MODELS = {
+    'diabetes': 'models/diabetes_model.sav',
+    'heart': 'models/heart_disease_model.sav',
+    'parkinsons': 'models/parkinsons_model.sav',
+    'lung_cancer': 'models/lung_cancer_model.sav',
+    'hepatitis': 'models/hepititisc_model.sav',
+    'liver': 'models/liver_model.sav',
+}
+
+
+@lru_cache(maxsize=None)
+def default_registry():
+    '''
+    Registry of every model used by app.py, shared by the whole process
+    '''
+    registry = ModelRegistry()
+    for name, path in TABULAR_MODELS.items():
+        registry.register(name, lambda path=path: joblib.load(path))
+    registry.register('symptom', load_symptom_model)
+    return registry
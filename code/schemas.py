@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+
+YES_NO = {'NO': 1, 'YES': 2}
+BINARY = {False: 0, True: 1}
+
+
+class FeatureSchema:
+    '''
+    Ordered input features of one tabular model, declared once.
+
+    Every feature is a name and an encoding: None for a numeric feature,
+    or a dict mapping each accepted category to its numeric code. Inputs
+    go straight to a contiguous float64 row (or batch) in model column
+    order, without building a DataFrame.
+    '''
+
+    def __init__(self, features):
+        self.names = [name for name, _ in features]
+        self.encodings = dict(features)
+        self.position = {name: idx for idx, name in enumerate(self.names)}
+
+    @property
+    def width(self):
+        return len(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def categories(self, name):
+        '''
+        Accepted values of a categorical feature, in declaration order
+        '''
+        return list(self.encodings[name])
+
+    def encode_value(self, name, value):
+        '''
+        Numeric code of one value; categorical features also accept values
+        that are already codes (as found in the training CSV files)
+        '''
+        encoding = self.encodings[name]
+        if encoding is None:
+            return float(value)
+        if value in encoding:
+            return float(encoding[value])
+        if value in encoding.values():
+            return float(value)
+        raise ValueError(f"{value!r} is not a valid {name}, expected one of {list(encoding)}")
+
+    def row(self, values):
+        '''
+        Convert {feature name: value} to a (1, width) array ready for the model
+        '''
+        missing = [name for name in self.names if name not in values]
+        if missing:
+            raise ValueError(f"Missing features: {missing}")
+
+        X = np.empty((1, self.width), dtype=np.float64)
+        for idx, name in enumerate(self.names):
+            X[0, idx] = self.encode_value(name, values[name])
+        return X
+
+    def encode_column(self, name, values, invalid='raise'):
+        '''
+        Encode a whole column at once; categories are looked up once per
+        distinct value and missing values (None, NaN) stay NaN. With
+        invalid='nan', values that cannot be encoded (unknown categories,
+        text in a numeric column) become NaN instead of raising ValueError.
+        '''
+        encoding = self.encodings[name]
+        if encoding is None:
+            if invalid == 'nan':
+                return pd.to_numeric(np.asarray(values), errors='coerce').astype(np.float64)
+            return np.asarray(values, dtype=np.float64)
+
+        # factorize, unlike np.unique, accepts mixed labels and codes and
+        # marks missing values with -1, which picks the trailing NaN
+        inverse, uniques = pd.factorize(np.asarray(values, dtype=object))
+        codes = [self.encode_value(name, value) if invalid == 'raise' or self.accepts(name, value) else np.nan
+                 for value in uniques]
+        return np.array(codes + [np.nan], dtype=np.float64)[inverse]
+
+    def accepts(self, name, value):
+        encoding = self.encodings[name]
+        return value in encoding or value in encoding.values()
+
+    def batch(self, columns, invalid='raise'):
+        '''
+        Convert {feature name: sequence of values} (e.g. parsed CSV columns)
+        to a (n, width) array, one row per record (see encode_column for invalid)
+        '''
+        missing = [name for name in self.names if name not in columns]
+        if missing:
+            raise ValueError(f"Missing features: {missing}")
+
+        n_rows = len(columns[self.names[0]])
+        X = np.empty((n_rows, self.width), dtype=np.float64)
+        for idx, name in enumerate(self.names):
+            X[:, idx] = self.encode_column(name, columns[name], invalid)
+        return X
+
+    def batch_from_records(self, records):
+        '''
+        Same as batch for a list of {feature name: value} dicts
+        '''
+        return self.batch({name: [record[name] for record in records] for name in self.names})
+
+
+TABULAR_SCHEMAS = {
+    'diabetes': FeatureSchema([
+        ('Pregnancies', None),
+        ('Glucose', None),
+        ('BloodPressure', None),
+        ('SkinThickness', None),
+        ('Insulin', None),
+        ('BMI', None),
+        ('DiabetesPedigreeFunction', None),
+        ('Age', None),
+    ]),
+    'heart': FeatureSchema([
+        ('age', None),
+        ('sex', {'female': 0, 'male': 1}),
+        # heart.csv recodes the UCI Cleveland categories; the row counts give
+        # the meaning of each code. cp: 0 has 143 rows (asymptomatic), 1 has 50
+        # (atypical angina), 2 has 87 (non-anginal pain), 3 has 23 (typical angina)
+        ('cp', {'typical angina': 3, 'atypical angina': 1, 'non — anginal pain': 2, 'asymptotic': 0}),
+        ('trestbps', None),
+        ('chol', None),
+        ('fbs', BINARY),
+        # restecg: 1 has 152 rows (normal), 2 has 4 (ST-T wave abnormality),
+        # 0 has 147 (left ventricular hypertrophy)
+        ('restecg', {'normal': 1, 'having ST-T wave abnormality': 2, 'left ventricular hyperthrophy': 0}),
+        ('thalach', None),
+        ('exang', BINARY),
+        ('oldpeak', None),
+        # slope: 2 has 142 rows (upsloping), 1 has 140 (flat), 0 has 21 (downsloping)
+        ('slope', {'upsloping': 2, 'flat': 1, 'downsloping': 0}),
+        ('ca', None),
+        # thal (3/6/7 in UCI): 2 has 166 rows (normal), 1 has 18 (fixed defect),
+        # 3 has 117 (reversible defect) and 0 the 2 rows where it is missing
+        ('thal', {'normal': 2, 'fixed defect': 1, 'reversible defect': 3, 'unknown': 0}),
+    ]),
+    'parkinsons': FeatureSchema([
+        (name, None) for name in (
+            'MDVP:Fo(Hz)', 'MDVP:Fhi(Hz)', 'MDVP:Flo(Hz)', 'MDVP:Jitter(%)', 'MDVP:Jitter(Abs)',
+            'MDVP:RAP', 'MDVP:PPQ', 'Jitter:DDP', 'MDVP:Shimmer', 'MDVP:Shimmer(dB)', 'Shimmer:APQ3',
+            'Shimmer:APQ5', 'MDVP:APQ', 'Shimmer:DDA', 'NHR', 'HNR', 'RPDE', 'DFA', 'spread1',
+            'spread2', 'D2', 'PPE',
+        )
+    ]),
+    'lung_cancer': FeatureSchema([
+        ('GENDER', {'M': 1, 'F': 0, 'Male': 1, 'Female': 0}),
+        ('AGE', None),
+    ] + [
+        (name, YES_NO) for name in (
+            'SMOKING', 'YELLOW_FINGERS', 'ANXIETY', 'PEER_PRESSURE', 'CHRONICDISEASE', 'FATIGUE',
+            'ALLERGY', 'WHEEZING', 'ALCOHOLCONSUMING', 'COUGHING', 'SHORTNESSOFBREATH',
+            'SWALLOWINGDIFFICULTY', 'CHESTPAIN',
+        )
+    ]),
+    'hepatitis': FeatureSchema([
+        ('Age', None),
+        ('Sex', {'Male': 1, 'Female': 2, 'm': 1, 'f': 2}),
+    ] + [
+        (name, None) for name in ('ALB', 'ALP', 'ALT', 'AST', 'BIL', 'CHE', 'CHOL', 'CREA', 'GGT', 'PROT')
+    ]),
+    # Gender codes of the LabelEncoder used in Datasets/Code/liver.ipynb
+    'liver': FeatureSchema([
+        ('Age', None),
+        ('Gender', {'male': 1, 'female': 0, 'Male': 1, 'Female': 0}),
+        ('Total_Bilirubin', None),
+        ('Direct_Bilirubin', None),
+        ('Alkaline_Phosphotase', None),
+        ('Alamine_Aminotransferase', None),
+        ('Aspartate_Aminotransferase', None),
+        ('Total_Protiens', None),
+        ('Albumin', None),
+        ('Albumin_and_Globulin_Ratio', None),
+    ]),
+}
+
+# Training CSV of every tabular model and its columns that are not features
+# (ids, row numbers and the target), as dropped by the training notebooks
+TRAINING_DATA = {
+    'diabetes': ('Datasets/diabetes.csv', ['Outcome']),
+    'heart': ('Datasets/heart.csv', ['target']),
+    'parkinsons': ('Datasets/parkinsons.csv', ['name', 'status']),
+    'lung_cancer': ('data/lung_cancer.csv', ['LUNG_CANCER']),
+    'hepatitis': ('Datasets/HepatitisCdata.csv', ['', 'Category']),
+    'liver': ('Datasets/liver.csv', ['Dataset']),
+}
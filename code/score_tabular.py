@@ -0,0 +1,267 @@
+# Run from the repository root:
+#   python -m code.score_tabular heart patients.csv heart_scores.csv
+#
+# Scores a large CSV, Parquet or Arrow (see code.columnar) extract with one
+# of the tabular models of app.py (models/*.sav). The input is read in chunks, every chunk is scored
+# on a process pool that loaded the model once per worker, and the
+# predictions are appended to the output (CSV or Parquet) in input order
+# as soon as they are ready. Only a few chunks are ever held in memory.
+#
+# Input columns are matched to the model features by name, ignoring case,
+# spaces and underscores; --map FEATURE=COLUMN overrides the matching.
+#
+# Missing numeric values are filled with the training median (from the
+# dataset manifest), as the training notebooks did. Rows that still cannot
+# be encoded (missing or unknown categories, text in numeric columns) are
+# not scored: their prediction is left empty and they are counted as skipped.
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from code.manifest import default_dataset_manifest
+from code.registry import TABULAR_MODELS
+from code.schemas import TABULAR_SCHEMAS, TRAINING_DATA
+
+# Set in every worker process by init_worker
+_worker = {}
+
+
+def init_worker(model_path, model_name, fill_values):
+    _worker.update(model=joblib.load(model_path), schema=TABULAR_SCHEMAS[model_name], fill_values=fill_values)
+
+
+def training_medians(model_name, manifest=None):
+    '''
+    Median of every numeric feature in the model's training data, {feature position: median}
+    '''
+    manifest = manifest or default_dataset_manifest()
+    schema = TABULAR_SCHEMAS[model_name]
+    dataset = TRAINING_DATA[model_name][0]
+    return {schema.position[name]: manifest.quantile(dataset, name, 0.5)
+            for name in schema.names if schema.encodings[name] is None}
+
+
+def score_chunk(columns):
+    '''
+    Predictions (and class probabilities when the model has them) of one
+    chunk, and the number of rows that could not be scored. Those rows get
+    a missing prediction (NaN or None) and NaN probabilities.
+    '''
+    model = _worker['model']
+    X = _worker['schema'].batch(columns, invalid='nan')
+    for idx, median in _worker['fill_values'].items():
+        X[np.isnan(X[:, idx]), idx] = median
+
+    complete = ~np.isnan(X).any(axis=1)
+    if complete.all():
+        predictions = model.predict(X)
+        probabilities = model.predict_proba(X) if hasattr(model, 'predict_proba') else None
+        return predictions, probabilities, 0
+
+    n_rows, n_skipped = len(X), int((~complete).sum())
+    if hasattr(model, 'classes_') and model.classes_.dtype.kind in 'biuf':
+        predictions = np.full(n_rows, np.nan)
+    else:
+        predictions = np.full(n_rows, None, dtype=object)
+    probabilities = None
+    if hasattr(model, 'predict_proba'):
+        probabilities = np.full((n_rows, len(model.classes_)), np.nan)
+    if complete.any():
+        predictions[complete] = model.predict(X[complete])
+        if probabilities is not None:
+            probabilities[complete] = model.predict_proba(X[complete])
+    return predictions, probabilities, n_skipped
+
+
+def column_key(name):
+    return str(name).strip().lower().replace(' ', '').replace('_', '')
+
+
+def map_columns(schema, input_columns, overrides=None):
+    '''
+    Input column feeding every schema feature, {feature: input column}
+    '''
+    by_key = {column_key(column): column for column in input_columns}
+    mapping = {}
+    for name in schema.names:
+        if overrides and name in overrides:
+            mapping[name] = overrides[name]
+        elif name in input_columns:
+            mapping[name] = name
+        elif column_key(name) in by_key:
+            mapping[name] = by_key[column_key(name)]
+
+    missing = [name for name in schema.names if name not in mapping]
+    if missing:
+        raise ValueError(f"No input column for the features {missing}, pass --map FEATURE=COLUMN")
+    return mapping
+
+
+def is_parquet(path):
+    return path.lower().endswith(('.parquet', '.pq'))
+
+
+def is_arrow(path):
+    return path.lower().endswith(('.arrow', '.feather'))
+
+
+def input_columns(input_path):
+    if is_arrow(input_path):
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        with pa.memory_map(input_path) as source:
+            return ipc.open_file(source).schema.names
+    if is_parquet(input_path):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(input_path).schema_arrow.names
+    return list(pd.read_csv(input_path, nrows=0).columns)
+
+
+def read_chunks(input_path, columns, chunksize):
+    '''
+    Yield {column: np.array} for every chunk, reading only the needed columns
+    '''
+    if is_arrow(input_path):
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        # Memory-mapped: slices are views, only the scored chunk is paged in
+        table = ipc.open_file(pa.memory_map(input_path)).read_all().select(columns)
+        for start in range(0, table.num_rows, chunksize):
+            batch = table.slice(start, chunksize)
+            yield {name: batch.column(name).to_numpy() for name in columns}
+    elif is_parquet(input_path):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunksize, columns=columns):
+            yield {name: batch.column(name).to_numpy(zero_copy_only=False) for name in columns}
+    else:
+        for chunk in pd.read_csv(input_path, usecols=columns, chunksize=chunksize):
+            yield {name: chunk[name].to_numpy() for name in columns}
+
+
+class ResultWriter:
+    '''
+    Appends scored chunks to a CSV or Parquet file
+    '''
+
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.parquet_writer = None
+        self.rows = 0
+
+    def write(self, df):
+        if is_parquet(self.output_path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self.parquet_writer is None:
+                self.parquet_writer = pq.ParquetWriter(self.output_path, table.schema)
+            self.parquet_writer.write_table(table)
+        else:
+            df.to_csv(self.output_path, mode='w' if self.rows == 0 else 'a', header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+
+def result_frame(start_row, predictions, probabilities, classes, kept):
+    df = pd.DataFrame({'row': np.arange(start_row, start_row + len(predictions))})
+    for name, values in kept.items():
+        df[name] = values
+    df['prediction'] = predictions
+    if probabilities is not None:
+        for idx, label in enumerate(classes):
+            df[f'probability_{label}'] = probabilities[:, idx]
+    return df
+
+
+def score_file(model_name, input_path, output_path, model_path=None, chunksize=50_000,
+               n_jobs=None, column_map=None, keep=()):
+    '''
+    Score every row of input_path with a tabular model and write the
+    predictions to output_path.
+
+    At most two chunks per worker are in flight, so memory does not grow
+    with the input size.
+
+    Output:
+    - summary (dict) = rows read, rows skipped, chunks and seconds taken
+    '''
+    model_path = model_path or TABULAR_MODELS[model_name]
+    schema = TABULAR_SCHEMAS[model_name]
+    mapping = map_columns(schema, input_columns(input_path), column_map)
+    columns = list(dict.fromkeys(list(mapping.values()) + list(keep)))
+    n_jobs = n_jobs or os.cpu_count() or 1
+    classes = getattr(joblib.load(model_path), 'classes_', None)
+    fill_values = training_medians(model_name)
+
+    start = time.perf_counter()
+    writer = ResultWriter(output_path)
+    pending = deque()
+    n_chunks = 0
+    n_skipped = 0
+
+    def write_oldest():
+        nonlocal n_skipped
+        start_row, kept, future = pending.popleft()
+        predictions, probabilities, skipped = future.result()
+        n_skipped += skipped
+        writer.write(result_frame(start_row, predictions, probabilities, classes, kept))
+
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=init_worker,
+                                 initargs=(model_path, model_name, fill_values)) as pool:
+            start_row = 0
+            for chunk in read_chunks(input_path, columns, chunksize):
+                features = {name: chunk[column] for name, column in mapping.items()}
+                kept = {name: chunk[name] for name in keep}
+                pending.append((start_row, kept, pool.submit(score_chunk, features)))
+                start_row += len(chunk[columns[0]])
+                n_chunks += 1
+                if len(pending) >= 2 * n_jobs:
+                    write_oldest()
+            while pending:
+                write_oldest()
+    finally:
+        writer.close()
+
+    return {'rows': writer.rows, 'skipped': n_skipped, 'chunks': n_chunks, 'seconds': time.perf_counter() - start}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Score a CSV, Parquet or Arrow file with a tabular disease model')
+    parser.add_argument('model', choices=sorted(TABULAR_SCHEMAS), help='model to score with')
+    parser.add_argument('input', help='input .csv, .parquet or .arrow file')
+    parser.add_argument('output', help='output .csv or .parquet file')
+    parser.add_argument('--model-path', default=None,
+                        help='model file to use instead of the one app.py loads')
+    parser.add_argument('--chunksize', type=int, default=50_000, help='rows per chunk')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--map', action='append', default=[], metavar='FEATURE=COLUMN',
+                        help='input column to use for a model feature')
+    parser.add_argument('--keep', action='append', default=[], metavar='COLUMN',
+                        help='input column copied to the output, e.g. a patient id')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    column_map = dict(item.split('=', 1) for item in args.map)
+    summary = score_file(args.model, args.input, args.output, model_path=args.model_path,
+                         chunksize=args.chunksize, n_jobs=args.jobs, column_map=column_map, keep=args.keep)
+    print(f"Scored {summary['rows']} rows in {summary['chunks']} chunks in {summary['seconds']:.1f}s "
+          f"({summary['rows'] / max(summary['seconds'], 1e-9):.0f} rows/s) -> {args.output}")
+    if summary['skipped']:
+        print(f"{summary['skipped']} rows could not be encoded and have no prediction")
+
+
+if __name__ == '__main__':
+    main()
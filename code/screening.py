@@ -0,0 +1,154 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from code.registry import default_registry
+from code.schemas import TABULAR_SCHEMAS
+
+# Fields of a union patient record shared by several models, with the
+# model feature each one feeds and how to convert it (a unit factor or a
+# value mapping). Lab values are taken in the units of the liver panel
+# (mg/dL, g/dL) and converted for the hepatitis model (umol/L, g/L).
+UNION_FIELDS = {
+    'age': [('diabetes', 'Age', None), ('heart', 'age', None), ('lung_cancer', 'AGE', None),
+            ('hepatitis', 'Age', None), ('liver', 'Age', None)],
+    'sex': [('heart', 'sex', None),
+            ('lung_cancer', 'GENDER', {'male': 'M', 'female': 'F'}),
+            ('hepatitis', 'Sex', {'male': 'Male', 'female': 'Female'}),
+            ('liver', 'Gender', None)],
+    'total_bilirubin': [('liver', 'Total_Bilirubin', None), ('hepatitis', 'BIL', 17.1)],
+    'direct_bilirubin': [('liver', 'Direct_Bilirubin', None)],
+    'alkaline_phosphatase': [('liver', 'Alkaline_Phosphotase', None), ('hepatitis', 'ALP', None)],
+    'alt': [('liver', 'Alamine_Aminotransferase', None), ('hepatitis', 'ALT', None)],
+    'ast': [('liver', 'Aspartate_Aminotransferase', None), ('hepatitis', 'AST', None)],
+    'total_proteins': [('liver', 'Total_Protiens', None), ('hepatitis', 'PROT', 10)],
+    'albumin': [('liver', 'Albumin', None), ('hepatitis', 'ALB', 10)],
+    'albumin_globulin_ratio': [('liver', 'Albumin_and_Globulin_Ratio', None)],
+    'cholesterol': [('heart', 'chol', None), ('hepatitis', 'CHOL', 1 / 38.67)],
+    'ggt': [('hepatitis', 'GGT', None)],
+    'cholinesterase': [('hepatitis', 'CHE', None)],
+    'creatinine': [('hepatitis', 'CREA', None)],
+}
+
+# Prediction meaning "at risk" for every tabular model
+POSITIVE_CLASS = {
+    'diabetes': 1,
+    'heart': 1,
+    'parkinsons': 1,
+    'lung_cancer': 'YES',
+    'hepatitis': 1,
+    'liver': 1,
+}
+
+
+def convert(value, how):
+    if how is None:
+        return value
+    if isinstance(how, dict):
+        return how.get(value, value)
+    return float(value) * how
+
+
+def model_inputs(record):
+    '''
+    Work out which tabular models a union record can feed. A feature is
+    filled from a shared field (see UNION_FIELDS) or from a record key with
+    the feature's own name; None values count as not provided.
+
+    Output:
+    - inputs (dict) = {model: {feature: value}} for every model with all features
+    - missing (dict) = {model: [features not provided]} for the other models
+    '''
+    provided = {key: value for key, value in record.items() if value is not None}
+    shared = {}
+    for field, targets in UNION_FIELDS.items():
+        if field in provided:
+            for model_name, feature, how in targets:
+                shared[(model_name, feature)] = convert(provided[field], how)
+
+    inputs, missing = {}, {}
+    for model_name, schema in TABULAR_SCHEMAS.items():
+        values, absent = {}, []
+        for feature in schema.names:
+            if feature in provided:
+                values[feature] = provided[feature]
+            elif (model_name, feature) in shared:
+                values[feature] = shared[(model_name, feature)]
+            else:
+                absent.append(feature)
+        if absent:
+            missing[model_name] = absent
+        else:
+            inputs[model_name] = values
+    return inputs, missing
+
+
+def run_tabular_model(registry, model_name, values):
+    start = time.perf_counter()
+    model = registry.get(model_name)
+    X = TABULAR_SCHEMAS[model_name].row(values)
+    prediction = model.predict(X)[0]
+    result = {
+        'model': model_name,
+        'prediction': prediction.item() if isinstance(prediction, np.generic) else prediction,
+        'at_risk': bool(prediction == POSITIVE_CLASS[model_name]),
+        'risk': None,
+    }
+    if hasattr(model, 'predict_proba') and hasattr(model, 'classes_'):
+        positive = np.flatnonzero(model.classes_ == POSITIVE_CLASS[model_name])
+        if len(positive):
+            result['risk'] = float(model.predict_proba(X)[0, positive[0]])
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def run_symptom_model(registry, symptoms):
+    start = time.perf_counter()
+    disease_model = registry.get('symptom')
+    diseases, probabilities = disease_model.predict_batch(disease_model.vocabulary.encode(symptoms))
+    return {
+        'model': 'symptom',
+        'prediction': diseases[0],
+        'at_risk': None,
+        'risk': float(probabilities[0]),
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def screen(record, registry=None, max_workers=None):
+    '''
+    Run every model the union record can feed, concurrently on a thread
+    pool, so the total time is about that of the slowest model. A list of
+    symptom names under 'symptoms' also runs the symptom model.
+
+    Output:
+    - report (dict) with
+      - results: one dict per model that ran (model, prediction, at_risk,
+        risk = probability of the positive class when available, seconds),
+        or (model, error) when it failed. The symptom model reports the
+        most likely disease and its probability as risk.
+      - skipped: {model: [missing features]} for the models that could not run
+      - seconds: wall time of the whole screening
+    '''
+    if registry is None:
+        registry = default_registry()
+
+    start = time.perf_counter()
+    inputs, skipped = model_inputs(record)
+    tasks = [(model_name, run_tabular_model, (registry, model_name, values))
+             for model_name, values in inputs.items() if model_name in registry]
+    if record.get('symptoms') and 'symptom' in registry:
+        tasks.append(('symptom', run_symptom_model, (registry, list(record['symptoms']))))
+
+    results = []
+    if tasks:
+        with ThreadPoolExecutor(max_workers=max_workers or len(tasks)) as pool:
+            futures = [(model_name, pool.submit(task, *args)) for model_name, task, args in tasks]
+            for model_name, future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as error:
+                    results.append({'model': model_name, 'error': str(error)})
+
+    return {'results': results, 'skipped': skipped, 'seconds': time.perf_counter() - start}
@@ -0,0 +1,109 @@
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import xgboost as xgb
+from sklearn.model_selection import StratifiedKFold
+
+DEFAULT_GRID = {
+    'max_depth': [2, 4, 6],
+    'learning_rate': [0.1, 0.3],
+    'min_child_weight': [1, 5],
+}
+
+# Set in every worker process by init_worker
+_data = {}
+_fold_cache = {}
+
+
+def init_worker(X, y, folds, n_classes):
+    _data.update(X=X, y=y, folds=folds, n_classes=n_classes)
+    _fold_cache.clear()
+
+
+def fold_matrices(fold):
+    '''
+    Train and validation DMatrix of a fold, built once per worker process
+    and reused by every trial that lands on this worker
+    '''
+    if fold not in _fold_cache:
+        train_idx, val_idx = _data['folds'][fold]
+        X, y = _data['X'], _data['y']
+        dtrain = xgb.DMatrix(X[train_idx], label=y[train_idx])
+        dval = xgb.DMatrix(X[val_idx], label=y[val_idx])
+        _fold_cache[fold] = (dtrain, dval, X[val_idx], y[val_idx])
+    return _fold_cache[fold]
+
+
+def run_trial(params, fold, max_rounds, early_stopping_rounds, latency_rows):
+    dtrain, dval, X_val, y_val = fold_matrices(fold)
+    train_params = dict(params, objective='multi:softprob', num_class=_data['n_classes'],
+                        tree_method='hist', eval_metric='mlogloss', nthread=1)
+
+    booster = xgb.train(train_params, dtrain, num_boost_round=max_rounds, evals=[(dval, 'val')],
+                        early_stopping_rounds=early_stopping_rounds, verbose_eval=False)
+    n_rounds = booster.best_iteration + 1
+    iteration_range = (0, n_rounds)
+
+    preds = booster.predict(dval, iteration_range=iteration_range).argmax(axis=1)
+    accuracy = float((preds == y_val).mean())
+
+    # Single-row latency, the way the web app calls the model
+    rows = X_val[:latency_rows]
+    start = time.perf_counter()
+    for row in rows:
+        booster.inplace_predict(row[None, :], iteration_range=iteration_range)
+    latency = (time.perf_counter() - start) / len(rows)
+
+    return accuracy, n_rounds, latency
+
+
+def parameter_grid(grid):
+    names = list(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def grid_search(X, y, grid=None, n_folds=3, max_rounds=300, early_stopping_rounds=10,
+                accuracy_tolerance=0.001, latency_rows=50, n_jobs=None, random_state=0):
+    '''
+    Cross-validated grid search over XGBoost parameters.
+
+    Every (parameters, fold) pair is a separate task on a process pool and
+    stops boosting once the validation fold stops improving. Among the
+    candidates whose mean accuracy is within accuracy_tolerance of the best
+    one, the fastest per-row predictor wins.
+
+    Output:
+    - best (dict) = winning parameters, with n_estimators set from early stopping
+    - results (list of dict) = mean accuracy, rounds and latency per candidate
+    '''
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    n_classes = int(y.max()) + 1
+    folds = list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=random_state).split(X, y))
+    candidates = list(parameter_grid(grid or DEFAULT_GRID))
+
+    with ProcessPoolExecutor(max_workers=n_jobs or os.cpu_count(), initializer=init_worker,
+                             initargs=(X, y, folds, n_classes)) as pool:
+        futures = {
+            (i, fold): pool.submit(run_trial, params, fold, max_rounds, early_stopping_rounds, latency_rows)
+            for i, params in enumerate(candidates)
+            for fold in range(n_folds)
+        }
+        scores = {key: future.result() for key, future in futures.items()}
+
+    results = []
+    for i, params in enumerate(candidates):
+        accuracy, n_rounds, latency = np.mean([scores[i, fold] for fold in range(n_folds)], axis=0)
+        results.append({'params': params, 'accuracy': accuracy, 'n_rounds': int(round(n_rounds)),
+                        'latency_ms': latency * 1000})
+
+    best_accuracy = max(result['accuracy'] for result in results)
+    contenders = [result for result in results if result['accuracy'] >= best_accuracy - accuracy_tolerance]
+    winner = min(contenders, key=lambda result: result['latency_ms'])
+
+    best = dict(winner['params'], n_estimators=winner['n_rounds'], tree_method='hist')
+    return best, results
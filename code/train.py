@@ -1,55 +1,167 @@
+# Run from the repository root: python -m code.train
+#
+# --search  pick the XGBoost parameters with a parallel cross-validated grid
+#           search instead of using the defaults
+# --compact drop or merge low-contribution trees and leaves, as long as the
+#           accuracy drops by at most --max-accuracy-loss and no probability
+#           moves by more than --max-probability-change on a validation
+#           split held out of the training rows; the result is reported on
+#           the test split
+# --deduplicate  fit on the distinct training rows weighted by their count;
+#           --check-dedup also fits on every row and compares both models
+
+import argparse
+import time
+
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 from sklearn import preprocessing
 import xgboost as xgb
+from code.compiled import CompiledEnsemble, check_compiled
+from code.build_lookup import build_lookup_table
+from code.artifacts import export_binary_model, file_sha1
+from code.bundle import write_bundle
+from code.compact import compact_model, compare_models
+from code.columnar import convert_dataset, read_frame
+from code.cooccurrence import CooccurrenceIndex
+from code.dedup import deduplicate_rows
+from code.search import grid_search
+from code.vocabulary import SymptomVocabulary
 import joblib
 import gzip
 
-# Machine learning model: XGBoost 
 
-# import the dataset
-dataset_df = pd.read_csv('data/dataset.csv')
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Train the symptom XGBoost model')
+    parser.add_argument('--search', action='store_true',
+                        help='choose parameters with a parallel cross-validated grid search')
+    parser.add_argument('--compact', action='store_true',
+                        help='prune low-contribution trees and leaves after training')
+    parser.add_argument('--max-accuracy-loss', type=float, default=0.0,
+                        help='largest validation accuracy drop accepted from --compact')
+    parser.add_argument('--max-probability-change', type=float, default=0.01,
+                        help='largest change of any validation probability accepted from --compact')
+    parser.add_argument('--deduplicate', action='store_true',
+                        help='fit on unique training rows with their counts as sample weights')
+    parser.add_argument('--check-dedup', action='store_true',
+                        help='with --deduplicate, also fit on all rows and compare the two models')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Machine learning model: XGBoost
+
+    # import the dataset
+    dataset_df = read_frame('data/dataset.csv')
+
+    # Preprocess: multi-hot encode the symptom columns straight into a uint8 matrix
+    symptom_df = dataset_df.filter(regex='Symptom')
+    vocabulary = SymptomVocabulary.from_symptom_columns(symptom_df)
+
+    clean_df = pd.DataFrame(vocabulary.encode_symptom_columns(symptom_df), columns=vocabulary.symptoms)
+    clean_df['Disease'] = dataset_df['Disease'].str.strip()
+
+    clean_df.to_csv('data/clean_dataset.tsv', sep='\t', index=False)
+    convert_dataset('data/clean_dataset.tsv')
+
+    # Preprocessing
+    X_data = clean_df.iloc[:,:-1]
+    y_data = clean_df.iloc[:,-1]
+
+    # Convert y to categorical values
+    y_data = y_data.astype('category')
+
+    # Convert y categories tu numbers with encoder
+    le = preprocessing.LabelEncoder()
+    le.fit(y_data)
+
+    # Symptom co-occurrence counts for next-symptom suggestions
+    CooccurrenceIndex.build(X_data.values, le.transform(y_data), len(le.classes_)).save('model/symptom_cooccurrence.npz')
+
+    X_train, X_test, y_train, y_test = train_test_split(X_data, y_data, test_size=0.2)
+
+    # Convert labels to numbers
+    y_train = le.transform(y_train)
+    y_test = le.transform(y_test)
+
+    # Compaction picks its threshold on rows kept out of both fit and test
+    if args.compact:
+        X_train, X_val, y_train, y_val = train_test_split(X_train, y_train, test_size=0.2)
 
-# Preprocess
-dataset_df = dataset_df.apply(lambda col: col.str.strip())
+    # Init classifier
+    if args.search:
+        best_params, results = grid_search(X_train.values, y_train)
+        for result in sorted(results, key=lambda result: -result['accuracy']):
+            print(f"{result['params']} accuracy={result['accuracy']:.4f} "
+                  f"rounds={result['n_rounds']} latency={result['latency_ms']:.3f}ms")
+        print(f"Selected parameters: {best_params}")
+        model = xgb.XGBClassifier(**best_params)
+    else:
+        model = xgb.XGBClassifier()
 
-test = pd.get_dummies(dataset_df.filter(regex='Symptom'), prefix='', prefix_sep='')
-test = test.groupby(test.columns, axis=1).agg(np.max)
-clean_df = pd.merge(test,dataset_df['Disease'], left_index=True, right_index=True)
+    # Fit
+    if args.deduplicate:
+        X_unique, y_unique, weights = deduplicate_rows(X_train.values, y_train)
+        print(f"Deduplicated {len(X_train)} training rows into {len(X_unique)} weighted rows")
+        start = time.perf_counter()
+        model.fit(pd.DataFrame(X_unique, columns=X_train.columns), y_unique, sample_weight=weights)
+        print(f"Weighted fit took {time.perf_counter() - start:.2f}s")
 
-clean_df.to_csv('data/clean_dataset.tsv', sep='\t', index=False)
+        if args.check_dedup:
+            full_model = xgb.XGBClassifier(**model.get_params())
+            start = time.perf_counter()
+            full_model.fit(X_train, y_train)
+            print(f"Fit on all rows took {time.perf_counter() - start:.2f}s")
+            difference = np.abs(model.predict_proba(X_test) - full_model.predict_proba(X_test)).max()
+            same = (model.predict(X_test) == full_model.predict(X_test)).all()
+            print(f"Max probability difference on the test set: {difference:.2e}, same predictions: {same}")
+    else:
+        model.fit(X_train, y_train)
 
-# Preprocessing
-X_data = clean_df.iloc[:,:-1]
-y_data = clean_df.iloc[:,-1]
+    # Predict
+    preds = model.predict(X_test)
 
-# Convert y to categorical values
-y_data = y_data.astype('category')
+    # Test accuracy
+    print(f"The accuracy of the model is {accuracy_score(y_test, preds)}")
 
-# Convert y categories tu numbers with encoder
-le = preprocessing.LabelEncoder()
-le.fit(y_data)
+    if args.compact:
+        # Fails without writing any artifact if accuracy would drop too much
+        compacted, report = compact_model(model.get_booster(), X_val.values, y_val,
+                                          max_accuracy_loss=args.max_accuracy_loss,
+                                          max_probability_change=args.max_probability_change)
+        test_report = compare_models(model.get_booster(), compacted, X_test.values, y_test)
+        print(f"Compaction threshold {report['threshold']} (chosen on {len(X_val)} validation rows): "
+              f"test accuracy {test_report['accuracy_before']} -> {test_report['accuracy_after']}, "
+              f"max test probability change {test_report['max_probability_change']:.4f}")
+        print(f"Size before: {report['before']}")
+        print(f"Size after:  {report['after']}")
+        model = xgb.XGBClassifier()
+        model.load_model(bytearray(compacted.save_raw('json')))
 
-X_train, X_test, y_train, y_test = train_test_split(X_data, y_data, test_size=0.2)
+    # Check the NumPy compiled ensemble matches xgboost on the test set
+    compiled = CompiledEnsemble.from_booster(model.get_booster())
+    print(f"Compiled ensemble max probability error: {check_compiled(compiled, model, X_test.values)}")
 
-# Convert labels to numbers
-y_train = le.transform(y_train)
-y_test = le.transform(y_test)
+    # Export model
+    joblib.dump(model, gzip.open('model/model_binary.dat.gz', "wb"))
+    model.save_model("model/xgboost_model.json")
 
-# Init classifier
-model = xgb.XGBClassifier()
+    # Binary artifacts that load faster than the JSON document
+    export_binary_model("model/xgboost_model.json")
+    compiled.model_version = file_sha1("model/xgboost_model.json")
+    compiled.save("model/compiled_model.npz")
 
-# Fit
-model.fit(X_train, y_train)
+    # Precompute predictions of every training pattern for the new model
+    build_lookup_table()
 
-# Predict
-preds = model.predict(X_test)
+    # Single versioned file with everything the predictor needs at runtime
+    manifest = write_bundle('model/symptom_bundle.zip')
+    print(f"Wrote model/symptom_bundle.zip for model {manifest['model_version']}")
 
-# Test accuracy
-print(f"The accuracy of the model is {accuracy_score(y_test, preds)}")
 
-# Export model
-joblib.dump(model, gzip.open('model/model_binary.dat.gz', "wb"))
-model.save_model("model/xgboost_model.json")
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+
+def read_severity(severity_path='data/Symptom-severity.csv'):
+    '''
+    Severity weight of every symptom as a {symptom: weight} dict. The
+    highest weight wins when a symptom is listed twice.
+    '''
+    df = pd.read_csv(severity_path)
+    df['Symptom'] = df['Symptom'].str.strip()
+    return df.groupby('Symptom')['weight'].max().astype(float).to_dict()
+
+
+class SeverityWeights:
+    '''
+    Severity weight per vocabulary symptom, lined up with the model columns.
+
+    The triage score of a patient is the sum of the weights of their
+    symptoms, so scoring a whole batch is one product of the multi-hot
+    symptom matrix with the weight vector.
+    '''
+
+    def __init__(self, vocabulary, severity, default_weight=None):
+        self.vocabulary = vocabulary
+        # The severity table spells a few symptoms without the stray spaces
+        # of the dataset ('foul_smell_ofurine' for 'foul_smell_of urine')
+        by_key = {symptom.replace(' ', ''): weight for symptom, weight in severity.items()}
+        if default_weight is None:
+            default_weight = float(np.median(list(severity.values())))
+
+        self.weights = np.array(
+            [by_key.get(symptom.replace(' ', ''), default_weight) for symptom in vocabulary.symptoms],
+            dtype=np.float64,
+        )
+
+    @classmethod
+    def from_csv(cls, vocabulary, severity_path='data/Symptom-severity.csv'):
+        return cls(vocabulary, read_severity(severity_path))
+
+    def score(self, X):
+        '''
+        Triage score of every row of the (n, width) symptom matrix (dense or sparse)
+        '''
+        return np.asarray(X @ self.weights, dtype=np.float64).ravel()
+
+    def priority_order(self, X):
+        '''
+        Row indices from the most to the least urgent, ties kept in arrival order
+        '''
+        return np.argsort(-self.score(X), kind='stable')
@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+
+class SymptomVocabulary:
+    '''
+    Maps symptom names to the column positions used by the symptom model.
+
+    Build it once (from the model or from the header of the clean dataset)
+    and reuse it for every encoding instead of re-reading the dataset.
+    '''
+
+    def __init__(self, symptoms):
+        self.symptoms = list(symptoms)
+        self.index = {symptom: idx for idx, symptom in enumerate(self.symptoms)}
+
+    @property
+    def width(self):
+        return len(self.symptoms)
+
+    def __len__(self):
+        return len(self.symptoms)
+
+    def __contains__(self, symptom):
+        return symptom in self.index
+
+    @classmethod
+    def from_tsv(cls, dataset_path='data/clean_dataset.tsv'):
+        # Only the header is needed, the last column is the disease label
+        columns = pd.read_csv(dataset_path, sep='\t', nrows=0).columns
+        return cls(columns[:-1])
+
+    @classmethod
+    def from_model(cls, model, dataset_path='data/clean_dataset.tsv'):
+        '''
+        Build the vocabulary from the feature names stored in a fitted
+        XGBClassifier, falling back to the dataset header for models saved
+        without names. The width always matches the model input width.
+        '''
+        booster = model.get_booster()
+        if booster.feature_names is not None:
+            return cls(booster.feature_names)
+
+        vocabulary = cls.from_tsv(dataset_path)
+        if vocabulary.width != booster.num_features():
+            raise ValueError(
+                f"Dataset has {vocabulary.width} symptoms but the model expects {booster.num_features()}"
+            )
+        return vocabulary
+
+    def encode(self, symptoms):
+        '''
+        Convert a list of symptoms to a (1, width) array ready for the model
+        '''
+        symptoms_array = np.zeros((1, self.width))
+        for symptom in symptoms:
+            symptoms_array[0, self.index[symptom]] = 1
+
+        return symptoms_array
+
+    @classmethod
+    def from_symptom_columns(cls, symptom_df):
+        '''
+        Build the vocabulary from the Symptom_* columns of the raw dataset,
+        sorted like the columns of clean_dataset.tsv
+        '''
+        uniques = pd.Series(pd.unique(symptom_df.to_numpy(dtype=object).ravel())).dropna()
+        return cls(sorted(uniques.str.strip().unique()))
+
+    def encode_batch(self, symptom_lists, sparse=False, dtype=np.float64):
+        '''
+        Convert many symptom lists to a (n, width) multi-hot matrix.
+
+        Output:
+        - X (np.array or scipy.sparse.csr_matrix) = one row per symptom list
+        '''
+        rows = []
+        codes = []
+        for row, symptoms in enumerate(symptom_lists):
+            for symptom in symptoms:
+                rows.append(row)
+                codes.append(self.index[symptom])
+
+        return self.multi_hot(np.asarray(rows, dtype=np.int64), np.asarray(codes, dtype=np.int64),
+                              len(symptom_lists), sparse, dtype)
+
+    def encode_symptom_columns(self, symptom_df, sparse=False, dtype=np.uint8):
+        '''
+        Convert the Symptom_* columns of the raw dataset (one symptom name or
+        NaN per cell) to a (n, width) multi-hot matrix without building
+        intermediate dummy columns. Every cell is mapped to its integer code
+        in one vectorized pass.
+
+        Output:
+        - X (np.array or scipy.sparse.csr_matrix) = one row per dataset row
+        '''
+        n_rows, n_columns = symptom_df.shape
+        # Factorize the raw cells (NaN gets -1), then strip and look up only
+        # the few hundred distinct strings instead of every cell
+        cell_codes, uniques = pd.factorize(symptom_df.to_numpy(dtype=object).ravel())
+        stripped = pd.Index(uniques).str.strip()
+        unique_codes = pd.Categorical(stripped, categories=self.symptoms).codes.astype(np.int64)
+
+        if (unique_codes < 0).any():
+            raise KeyError(f"Symptoms not in the vocabulary: {sorted(stripped[unique_codes < 0])}")
+
+        codes = np.where(cell_codes >= 0, unique_codes[cell_codes], -1)
+        rows = np.repeat(np.arange(n_rows, dtype=np.int64), n_columns)
+        present = codes >= 0
+        return self.multi_hot(rows[present], codes[present], n_rows, sparse, dtype)
+
+    def multi_hot(self, rows, codes, n_rows, sparse=False, dtype=np.float64):
+        if sparse:
+            from scipy.sparse import csr_matrix
+            X = csr_matrix((np.ones(len(codes), dtype=dtype), (rows, codes)), shape=(n_rows, self.width))
+            # A symptom listed twice in a row is still a single 1
+            X.data[:] = 1
+            return X
+
+        X = np.zeros((n_rows, self.width), dtype=dtype)
+        X[rows, codes] = 1
+        return X